@@ -3,6 +3,7 @@ Analyst Agent - Analyzes research data and generates insights.
 Creates visualizations and identifies trends from collected data.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -40,6 +41,15 @@ class AnalystAgent:
         
         logger.info("Analyst Agent initialized")
     
+    async def aexecute(
+        self,
+        research_data: Dict[str, Any],
+        topic: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of execute(); chart rendering runs in a worker thread."""
+        return await asyncio.to_thread(self.execute, research_data, topic, context)
+    
     @trace_agent_call("analyst")
     def execute(
         self,
@@ -385,6 +395,14 @@ class AnalystAgent:
             except Exception as e:
                 logger.error(f"Error generating visualization {spec.get('viz_id')}: {e}")
         
+        # Write this report's plotly PNGs in one pass now that every chart exists
+        failed_pngs = set(self.chart_generator.flush_png_exports(
+            viz.get("png_path") for viz in generated_visualizations
+        ))
+        for viz in generated_visualizations:
+            if viz.get("png_path") in failed_pngs:
+                viz["png_path"] = None
+        
         return generated_visualizations
     
     def _save_analysis(
@@ -3,6 +3,7 @@ API Researcher Agent - Calls external APIs for data collection.
 Processes API responses and tracks sources for citations.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -43,6 +44,15 @@ class APIResearcherAgent:
         
         logger.info("API Researcher Agent initialized")
     
+    async def aexecute(
+        self,
+        api_requests: List[Dict[str, Any]],
+        topic: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of execute(); the blocking API calls run in a worker thread."""
+        return await asyncio.to_thread(self.execute, api_requests, topic, context)
+    
     @trace_agent_call("api_researcher")
     def execute(
         self,
@@ -77,12 +87,10 @@ class APIResearcherAgent:
             
             logger.info(f"API Researcher calling {len(api_requests)} APIs for topic: {topic}")
             
-            # Make all API calls
-            api_results = []
-            for req in api_requests:
-                result = self.api_caller.call_api(**req)
-                api_results.append(result)
-                
+            # Make all API calls (concurrently)
+            api_results = self.api_caller.batch_api_calls(api_requests)
+            
+            for req, result in zip(api_requests, api_results):
                 # Log each API call
                 if tracker:
                     tracker.log_tool_usage(
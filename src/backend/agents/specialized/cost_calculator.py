@@ -3,6 +3,7 @@ Cost Calculator Agent - Estimates token usage and costs for report generation.
 Provides cost breakdown before initiating the research process.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
@@ -55,6 +56,14 @@ class CostCalculatorAgent:
         
         logger.info("Cost Calculator Agent initialized")
     
+    async def aexecute(
+        self,
+        report_requirements: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of execute(); the estimate is computed in a worker thread."""
+        return await asyncio.to_thread(self.execute, report_requirements, context)
+    
     @trace_agent_call("cost_calculator")
     def execute(
         self,
@@ -3,6 +3,7 @@ Data Collector Agent - Performs web scraping to collect research data.
 Extracts content from URLs and tracks sources for citations.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -43,6 +44,15 @@ class DataCollectorAgent:
         
         logger.info("Data Collector Agent initialized")
     
+    async def aexecute(
+        self,
+        urls: List[str],
+        topic: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of execute(); scraping runs in a worker thread."""
+        return await asyncio.to_thread(self.execute, urls, topic, context)
+    
     @trace_agent_call("data_collector")
     def execute(
         self,
@@ -3,6 +3,7 @@ Lead Researcher Agent - Orchestrates the multi-agent research process.
 Coordinates other agents and synthesizes final report structure.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -41,6 +42,14 @@ class LeadResearcherAgent:
         
         logger.info("Lead Researcher Agent initialized")
     
+    async def aexecute(
+        self,
+        user_request: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of execute(); planning and its LLM calls run in a worker thread."""
+        return await asyncio.to_thread(self.execute, user_request, context)
+    
     @trace_agent_call("lead_researcher")
     def execute(
         self,
@@ -3,6 +3,7 @@ Straight-Through-LLM Agent - Direct content generation using LLM foundational kn
 Ensures every report section has comprehensive, meaningful content.
 """
 
+import asyncio
 import logging
 import json
 from typing import Dict, Any, List, Optional
@@ -36,6 +37,16 @@ class StraightThroughLLMAgent:
         
         logger.info("Straight-Through-LLM Agent initialized")
     
+    async def aexecute(
+        self,
+        report_structure: Dict[str, Any],
+        user_requirements: Dict[str, Any],
+        research_data: Optional[Dict[str, Any]] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of execute(); section generation runs in a worker thread."""
+        return await asyncio.to_thread(self.execute, report_structure, user_requirements, research_data, context)
+    
     @trace_agent_call("straight_through_llm")
     def execute(
         self,
@@ -9,16 +9,17 @@ from datetime import datetime
 import uuid
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 from orchestration.graph_builder import create_workflow
 from agents.specialized.cost_calculator import CostCalculatorAgent
-from orchestration.state import get_state_manager
+from orchestration.state import completion_status_dict, get_state_manager
 
 logger = logging.getLogger(__name__)
 
 # Create router
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Global workflow instance
 workflow = create_workflow()
@@ -104,8 +105,13 @@ class ReportStatusResponse(BaseModel):
 
 
 # Routes
-@router.post("/submit-requirements", response_model=SubmitRequirementsResponse)
-async def submit_requirements(request: SubmitRequirementsRequest):
+# Handlers that perform blocking work (state persistence, agent construction,
+# LLM calls) are plain `def` so FastAPI runs them in the threadpool.
+# Handlers build their response models directly, so the models are declared
+# via `responses` (OpenAPI only) rather than `response_model`, which would
+# validate every return value a second time.
+@router.post("/submit-requirements", responses={200: {"model": SubmitRequirementsResponse}})
+def submit_requirements(request: SubmitRequirementsRequest):
     """
     Submit report requirements and get initial analysis.
     
@@ -156,8 +162,8 @@ async def submit_requirements(request: SubmitRequirementsRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/cost-estimate/{session_id}", response_model=CostEstimateResponse)
-async def get_cost_estimate(session_id: str):
+@router.get("/cost-estimate/{session_id}", responses={200: {"model": CostEstimateResponse}})
+def get_cost_estimate(session_id: str):
     """
     Get cost estimate for report generation.
     
@@ -203,7 +209,7 @@ async def get_cost_estimate(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/preview-structure/{session_id}", response_model=ReportStructureResponse)
+@router.get("/preview-structure/{session_id}", responses={200: {"model": ReportStructureResponse}})
 async def get_report_structure(session_id: str):
     """
     Get report structure preview.
@@ -269,8 +275,8 @@ async def get_report_structure(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/generate-report", response_model=GenerateReportResponse)
-async def generate_report(
+@router.post("/generate-report", responses={200: {"model": GenerateReportResponse}})
+def generate_report(
     request: GenerateReportRequest,
     background_tasks: BackgroundTasks
 ):
@@ -332,7 +338,7 @@ async def get_workflow_debug_state(session_id: str):
             "current_agent": state.get("current_agent"),
             "completed_tasks": state.get("completed_tasks", []),
             "required_agents": state.get("required_agents", []),
-            "agent_completion_status": state.get("agent_completion_status", {}),
+            "agent_completion_status": completion_status_dict(state.get("agent_completion_status")),
             "agent_tasks": state.get("agent_tasks", {}),
             "has_report_structure": state.get("report_structure") is not None,
             "has_web_data": state.get("web_research_data") is not None,
@@ -379,7 +385,7 @@ async def list_sessions():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/report-status/{session_id}", response_model=ReportStatusResponse)
+@router.get("/report-status/{session_id}", responses={200: {"model": ReportStatusResponse}})
 async def get_report_status(session_id: str):
     """
     Get current status of report generation.
@@ -504,7 +510,9 @@ async def download_pdf(session_id: str):
 
 
 # Background task function
-async def _generate_report_background(
+# Declared sync so Starlette runs it in the threadpool - the workflow makes
+# blocking LLM and HTTP calls that would otherwise stall the event loop.
+def _generate_report_background(
     session_id: str,
     user_request: str,
     report_requirements: Dict[str, Any]
@@ -512,7 +520,7 @@ async def _generate_report_background(
     """
     Background task for report generation.
     
-    This runs the full multi-agent workflow asynchronously.
+    This runs the full multi-agent workflow in a worker thread.
     """
     try:
         logger.info(f"Background report generation started for: {session_id}")
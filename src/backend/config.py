@@ -25,6 +25,7 @@ class Settings(BaseSettings):
     langsmith_project: str = "market-research-agent"
     langchain_tracing_v2: bool = True
     langchain_endpoint: str = "https://api.smith.langchain.com"
+    langsmith_sample_rate: float = 1.0  # Fraction of calls traced (0.0-1.0)
     
     # Application Configuration
     app_env: str = "development"
@@ -36,6 +37,9 @@ class Settings(BaseSettings):
     # Backend Configuration
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
+    # Session state is held in-process, so keep a single worker unless a
+    # shared state backend is configured
+    backend_workers: int = 1
     
     # Storage Directories
     reports_dir: str = "./data/reports"
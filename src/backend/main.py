@@ -2,13 +2,29 @@
 Main FastAPI application entry point for the multi-agent market research system.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from anyio.to_thread import current_default_thread_limiter
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from config import settings
+from observability.langsmith_config import (
+    get_langsmith_config,
+    start_feedback_worker,
+    stop_feedback_worker
+)
+from tools.web_scraper import shutdown_parse_pool
+
+# Configuration is fixed for the process lifetime - resolve health flags once, at import
+# (not in the lifespan, so /health also works when the lifespan has not run)
+GEMINI_CONFIGURED = bool(settings.gemini_api_key)
+LANGSMITH_ENABLED = bool(settings.langsmith_api_key)
+
+# Threadpool capacity for sync route handlers and background tasks (anyio default: 40)
+THREADPOOL_SIZE = 200
 
 # Configure logging
 logging.basicConfig(
@@ -23,11 +39,18 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown events."""
     # Startup
     logger.info("Starting Multi-Agent Market Research System...")
-    logger.info(f"Environment: {settings.app_env}")
-    logger.info(f"Gemini Model: {settings.gemini_model}")
+    logger.info("Environment: %s", settings.app_env)
+    logger.info("Gemini Model: %s", settings.gemini_model)
+    
+    # Sync handlers run blocking LLM/IO work in the threadpool - give it headroom
+    current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    
+    # Initialize the LangSmith client up front rather than on the first traced call
+    get_langsmith_config()
     
     if settings.langsmith_api_key:
         logger.info("LangSmith observability enabled")
+        start_feedback_worker()
     
     # Ensure directories exist
     settings.create_directories()
@@ -37,6 +60,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down application...")
+    await stop_feedback_worker()
+    await asyncio.to_thread(shutdown_parse_pool)
 
 
 # Create FastAPI application
@@ -57,7 +82,7 @@ app.add_middleware(
 )
 
 
-@app.get("/")
+@app.get("/", response_class=ORJSONResponse)
 async def root():
     """Root endpoint - health check."""
     return {
@@ -68,13 +93,13 @@ async def root():
     }
 
 
-@app.get("/health")
+@app.get("/health", response_class=ORJSONResponse)
 async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "gemini_configured": bool(settings.gemini_api_key),
-        "langsmith_enabled": bool(settings.langsmith_api_key)
+        "gemini_configured": GEMINI_CONFIGURED,
+        "langsmith_enabled": LANGSMITH_ENABLED
     }
 
 
@@ -86,11 +111,18 @@ app.include_router(api_router, prefix="/api", tags=["api"])
 if __name__ == "__main__":
     import uvicorn
     
+    is_development = settings.app_env == "development"
+    
     uvicorn.run(
         "main:app",
         host=settings.backend_host,
         port=settings.backend_port,
-        reload=settings.app_env == "development",
+        loop="uvloop",
+        http="httptools",
+        # Per-request access logging is only useful while developing
+        access_log=is_development,
+        workers=1 if is_development else settings.backend_workers,
+        reload=is_development,
         log_level=settings.log_level.lower()
     )
 
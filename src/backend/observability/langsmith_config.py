@@ -3,18 +3,64 @@ LangSmith integration for observability and tracing of multi-agent system.
 Provides tracing, logging, and monitoring of LLM calls and agent interactions.
 """
 
+import asyncio
 import logging
 import os
-from typing import Optional, Dict, Any
+import random
+import zlib
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List
 from functools import wraps
 
+import requests
+from requests.adapters import HTTPAdapter
 from langsmith import Client
-from langsmith.run_helpers import traceable
+from langsmith.run_helpers import traceable, get_current_run_tree
+from langsmith.run_trees import RunTree
 
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Feedback batching: flush when this many items are queued or this many seconds pass
+FEEDBACK_BATCH_SIZE = 100
+FEEDBACK_FLUSH_INTERVAL = 0.5
+
+# Connection pool sizing for the shared LangSmith HTTP session
+LANGSMITH_POOL_CONNECTIONS = 50
+LANGSMITH_POOL_MAXSIZE = 100
+
+# Shared read-only metadata for decorators declared without metadata
+_EMPTY_METADATA = MappingProxyType({})
+
+# Root run of the active TrackedSession, used as parent for traced calls
+_session_run: ContextVar[Optional[RunTree]] = ContextVar("langsmith_session_run", default=None)
+
+# Session ID of the active TrackedSession, attached to traced call metadata
+_session_ctx: ContextVar[Optional[str]] = ContextVar("session_id", default=None)
+
+# Settings never change at runtime, so the exported tracing flag is fixed
+_TRACING_V2_ENV = str(settings.langchain_tracing_v2).lower()
+
+
+def _export_tracing_env():
+    """Export LangChain tracing environment variables once, idempotently."""
+    if (
+        os.environ.get("LANGCHAIN_API_KEY") == settings.langsmith_api_key
+        and os.environ.get("LANGCHAIN_PROJECT") == settings.langsmith_project
+    ):
+        return
+    
+    os.environ.update({
+        "LANGCHAIN_TRACING_V2": _TRACING_V2_ENV,
+        "LANGCHAIN_ENDPOINT": settings.langchain_endpoint,
+        "LANGCHAIN_API_KEY": settings.langsmith_api_key,
+        "LANGCHAIN_PROJECT": settings.langsmith_project
+    })
+    # Upload LangChain callback traces off the request path
+    os.environ.setdefault("LANGCHAIN_CALLBACKS_BACKGROUND", "true")
+
 
 class LangSmithConfig:
     """Configuration and setup for LangSmith observability."""
@@ -33,23 +79,34 @@ class LangSmithConfig:
         """Set up LangSmith client and environment variables."""
         try:
             # Set environment variables for LangChain tracing
-            os.environ["LANGCHAIN_TRACING_V2"] = str(settings.langchain_tracing_v2).lower()
-            os.environ["LANGCHAIN_ENDPOINT"] = settings.langchain_endpoint
-            os.environ["LANGCHAIN_API_KEY"] = settings.langsmith_api_key
-            os.environ["LANGCHAIN_PROJECT"] = settings.langsmith_project
+            _export_tracing_env()
             
-            # Initialize LangSmith client
+            # Initialize LangSmith client on a pooled keep-alive session
             self.client = Client(
                 api_url=settings.langchain_endpoint,
-                api_key=settings.langsmith_api_key
+                api_key=settings.langsmith_api_key,
+                session=self._create_http_session(),
+                auto_batch_tracing=True
             )
             
-            logger.info(f"LangSmith observability enabled for project: {settings.langsmith_project}")
+            logger.info("LangSmith observability enabled for project: %s", settings.langsmith_project)
             
         except Exception as e:
-            logger.error(f"Error setting up LangSmith: {e}")
+            logger.error("Error setting up LangSmith: %s", e)
             self.enabled = False
     
+    @staticmethod
+    def _create_http_session() -> requests.Session:
+        """Create an HTTP session that reuses TCP/TLS connections across uploads."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=LANGSMITH_POOL_CONNECTIONS,
+            pool_maxsize=LANGSMITH_POOL_MAXSIZE
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
     def is_enabled(self) -> bool:
         """Check if LangSmith is enabled."""
         return self.enabled
@@ -59,22 +116,85 @@ class LangSmithConfig:
         return self.client
 
 
-# Global LangSmith configuration instance
-_langsmith_config = LangSmithConfig()
+# Global LangSmith configuration instance (created on first use)
+_langsmith_config: Optional[LangSmithConfig] = None
 
 
 def get_langsmith_config() -> LangSmithConfig:
-    """Get the global LangSmith configuration instance."""
+    """
+    Get the global LangSmith configuration instance.
+    
+    The client and tracing environment are set up on first call rather than
+    at import time, so importing agents stays cheap and tests can install a
+    replacement via set_langsmith_config().
+    """
+    global _langsmith_config
+    if _langsmith_config is None:
+        _langsmith_config = LangSmithConfig()
     return _langsmith_config
 
 
-def trace_agent_call(agent_name: str, metadata: Optional[Dict[str, Any]] = None):
+def set_langsmith_config(config: Optional[LangSmithConfig]):
+    """Replace the global LangSmith configuration (None resets to lazy init)."""
+    global _langsmith_config
+    _langsmith_config = config
+
+
+def _should_sample(sample_rate: float, kwargs: Dict[str, Any]) -> bool:
+    """
+    Decide whether a call should be traced.
+    
+    Calls carrying a session_id are sampled deterministically so a session is
+    either fully traced or not traced at all; other calls are sampled randomly.
+    """
+    if sample_rate >= 1.0:
+        return True
+    if sample_rate <= 0.0:
+        return False
+    
+    session_id = kwargs.get("session_id") or _session_ctx.get()
+    if session_id:
+        bucket = zlib.crc32(str(session_id).encode("utf-8")) % 10000
+        return bucket < sample_rate * 10000
+    
+    return random.random() < sample_rate
+
+
+def _invoke_traced(traced_func, args, kwargs):
+    """
+    Call a traceable-wrapped function, attaching it to the active session.
+    
+    Top-level calls are parented to the session run; calls already nested
+    inside another traced run keep their natural parent. The session ID is
+    passed as per-call metadata so decorator metadata is never mutated.
+    """
+    langsmith_extra = {}
+    
+    session_id = _session_ctx.get()
+    if session_id is not None:
+        langsmith_extra["metadata"] = {"session_id": session_id}
+    
+    parent = _session_run.get()
+    if parent is not None and get_current_run_tree() is None:
+        langsmith_extra["parent"] = parent
+    
+    if langsmith_extra:
+        return traced_func(*args, langsmith_extra=langsmith_extra, **kwargs)
+    return traced_func(*args, **kwargs)
+
+
+def trace_agent_call(
+    agent_name: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    sample_rate: Optional[float] = None
+):
     """
     Decorator to trace agent calls with LangSmith.
     
     Args:
         agent_name: Name of the agent being traced
         metadata: Additional metadata to include in the trace
+        sample_rate: Fraction of calls to trace (defaults to settings.langsmith_sample_rate)
         
     Usage:
         @trace_agent_call("lead_researcher")
@@ -82,17 +202,22 @@ def trace_agent_call(agent_name: str, metadata: Optional[Dict[str, Any]] = None)
             # agent logic
             pass
     """
+    rate = settings.langsmith_sample_rate if sample_rate is None else sample_rate
+    trace_metadata = metadata or _EMPTY_METADATA
+    trace_tags = [agent_name, "agent_call"]
+    
     def decorator(func):
+        # Build the LangSmith wrapper once per decorated function, not per call
+        traced_func = traceable(
+            name=f"{agent_name}.{func.__name__}",
+            metadata=trace_metadata,
+            tags=trace_tags
+        )(func)
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            if _langsmith_config.is_enabled():
-                # Use LangSmith traceable decorator
-                traced_func = traceable(
-                    name=f"{agent_name}.{func.__name__}",
-                    metadata=metadata or {},
-                    tags=[agent_name, "agent_call"]
-                )(func)
-                return traced_func(*args, **kwargs)
+            if get_langsmith_config().is_enabled() and _should_sample(rate, kwargs):
+                return _invoke_traced(traced_func, args, kwargs)
             else:
                 # No tracing, just execute function
                 return func(*args, **kwargs)
@@ -100,13 +225,18 @@ def trace_agent_call(agent_name: str, metadata: Optional[Dict[str, Any]] = None)
     return decorator
 
 
-def trace_llm_call(operation: str, metadata: Optional[Dict[str, Any]] = None):
+def trace_llm_call(
+    operation: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    sample_rate: Optional[float] = None
+):
     """
     Decorator to trace LLM calls with LangSmith.
     
     Args:
         operation: Description of the LLM operation
         metadata: Additional metadata to include in the trace
+        sample_rate: Fraction of calls to trace (defaults to settings.langsmith_sample_rate)
         
     Usage:
         @trace_llm_call("generate_plan")
@@ -114,29 +244,39 @@ def trace_llm_call(operation: str, metadata: Optional[Dict[str, Any]] = None):
             # LLM call logic
             pass
     """
+    rate = settings.langsmith_sample_rate if sample_rate is None else sample_rate
+    trace_metadata = metadata or _EMPTY_METADATA
+    trace_tags = ["llm_call", operation]
+    
     def decorator(func):
+        traced_func = traceable(
+            name=f"llm.{operation}",
+            metadata=trace_metadata,
+            tags=trace_tags
+        )(func)
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            if _langsmith_config.is_enabled():
-                traced_func = traceable(
-                    name=f"llm.{operation}",
-                    metadata=metadata or {},
-                    tags=["llm_call", operation]
-                )(func)
-                return traced_func(*args, **kwargs)
+            if get_langsmith_config().is_enabled() and _should_sample(rate, kwargs):
+                return _invoke_traced(traced_func, args, kwargs)
             else:
                 return func(*args, **kwargs)
         return wrapper
     return decorator
 
 
-def trace_tool_call(tool_name: str, metadata: Optional[Dict[str, Any]] = None):
+def trace_tool_call(
+    tool_name: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    sample_rate: Optional[float] = None
+):
     """
     Decorator to trace tool calls with LangSmith.
     
     Args:
         tool_name: Name of the tool being called
         metadata: Additional metadata to include in the trace
+        sample_rate: Fraction of calls to trace (defaults to settings.langsmith_sample_rate)
         
     Usage:
         @trace_tool_call("web_scraper")
@@ -144,16 +284,21 @@ def trace_tool_call(tool_name: str, metadata: Optional[Dict[str, Any]] = None):
             # scraping logic
             pass
     """
+    rate = settings.langsmith_sample_rate if sample_rate is None else sample_rate
+    trace_metadata = metadata or _EMPTY_METADATA
+    trace_tags = ["tool_call", tool_name]
+    
     def decorator(func):
+        traced_func = traceable(
+            name=f"tool.{tool_name}",
+            metadata=trace_metadata,
+            tags=trace_tags
+        )(func)
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            if _langsmith_config.is_enabled():
-                traced_func = traceable(
-                    name=f"tool.{tool_name}",
-                    metadata=metadata or {},
-                    tags=["tool_call", tool_name]
-                )(func)
-                return traced_func(*args, **kwargs)
+            if get_langsmith_config().is_enabled() and _should_sample(rate, kwargs):
+                return _invoke_traced(traced_func, args, kwargs)
             else:
                 return func(*args, **kwargs)
         return wrapper
@@ -188,19 +333,57 @@ class TrackedSession:
         self.session_type = session_type
         self.metadata = metadata or {}
         self.run_id = None
+        self._run: Optional[RunTree] = None
+        self._run_token = None
+        self._session_token = None
     
     def __enter__(self):
-        """Start tracking session."""
-        if _langsmith_config.is_enabled():
-            logger.info(f"Starting tracked session: {self.session_id}")
-            # Note: Actual session tracking would use LangSmith's run context
-            # This is a simplified version
+        """Start tracking session as a parent run for all traced calls inside it."""
+        self._session_token = _session_ctx.set(self.session_id)
+        config = get_langsmith_config()
+        
+        if config.is_enabled():
+            logger.info("Starting tracked session: %s", self.session_id)
+            try:
+                self._run = RunTree(
+                    name=f"session.{self.session_type}",
+                    run_type="chain",
+                    inputs={"session_id": self.session_id},
+                    tags=[self.session_type],
+                    extra={"metadata": {**self.metadata, "session_id": self.session_id}},
+                    client=config.get_client()
+                )
+                self._run.post()
+                self.run_id = str(self._run.id)
+                self._run_token = _session_run.set(self._run)
+            except Exception as e:
+                logger.error("Error starting session run for %s: %s", self.session_id, e)
+                self._run = None
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """End tracking session."""
-        if _langsmith_config.is_enabled():
-            logger.info(f"Ending tracked session: {self.session_id}")
+        """End tracking session and close its parent run."""
+        if self._session_token is not None:
+            _session_ctx.reset(self._session_token)
+            self._session_token = None
+        
+        if self._run_token is not None:
+            _session_run.reset(self._run_token)
+            self._run_token = None
+        
+        if self._run is not None:
+            try:
+                self._run.end(
+                    outputs={"session_id": self.session_id},
+                    error=str(exc_val) if exc_val else None
+                )
+                self._run.patch()
+            except Exception as e:
+                logger.error("Error ending session run for %s: %s", self.session_id, e)
+            self._run = None
+        
+        if get_langsmith_config().is_enabled():
+            logger.info("Ending tracked session: %s", self.session_id)
         return False
 
 
@@ -211,17 +394,32 @@ def log_agent_metrics(
     """
     Log agent performance metrics to LangSmith.
     
+    Numeric metrics are recorded as feedback ("<agent>.<metric>") on the
+    current traced run (or the active TrackedSession's run), through the same
+    batching worker as create_feedback().
+    
     Args:
         agent_name: Name of the agent
         metrics: Dictionary of metrics to log
     """
-    if _langsmith_config.is_enabled():
-        try:
-            logger.info(f"Agent metrics for {agent_name}: {metrics}")
-            # In a full implementation, this would send metrics to LangSmith
-            # For now, we just log them
-        except Exception as e:
-            logger.error(f"Error logging metrics for {agent_name}: {e}")
+    config = get_langsmith_config()
+    if not (config.is_enabled() and config.client):
+        return
+    
+    logger.debug("Agent metrics for %s: %s", agent_name, metrics)
+    
+    run = get_current_run_tree() or _session_run.get()
+    if run is None:
+        return
+    
+    for name, value in metrics.items():
+        if isinstance(value, (int, float)):
+            _enqueue_feedback({
+                "run_id": str(run.id),
+                "key": f"{agent_name}.{name}",
+                "score": float(value),
+                "comment": None
+            })
 
 
 def create_feedback(
@@ -233,6 +431,10 @@ def create_feedback(
     """
     Create feedback for a LangSmith run.
     
+    Feedback is queued and submitted in batches by the background worker
+    started in the application lifespan. When no worker is running (e.g. in
+    standalone scripts), the feedback is submitted immediately.
+    
     Args:
         run_id: LangSmith run ID
         key: Feedback key (e.g., "accuracy", "helpfulness")
@@ -241,19 +443,130 @@ def create_feedback(
     """
     config = get_langsmith_config()
     
-    if config.is_enabled() and config.client:
+    if not (config.is_enabled() and config.client):
+        return
+    
+    _enqueue_feedback({"run_id": run_id, "key": key, "score": score, "comment": comment})
+
+
+def _enqueue_feedback(item: Dict[str, Any]):
+    """Hand a feedback item to the worker, or submit it now if no worker is running."""
+    queue, loop = _feedback_queue, _feedback_loop
+    if queue is None or loop is None:
+        _submit_feedback_batch([item])
+        return
+    
+    # Safe to call from both the event loop and threadpool workers
+    loop.call_soon_threadsafe(queue.put_nowait, item)
+
+
+def _submit_feedback_batch(batch: List[Dict[str, Any]]):
+    """Submit a batch of queued feedback items to LangSmith."""
+    client = get_langsmith_config().get_client()
+    if client is None:
+        return
+    
+    for item in batch:
         try:
-            config.client.create_feedback(
-                run_id=run_id,
-                key=key,
-                score=score,
-                comment=comment
-            )
-            logger.info(f"Feedback created for run {run_id}: {key}={score}")
+            client.create_feedback(**item)
         except Exception as e:
-            logger.error(f"Error creating feedback: {e}")
+            logger.error("Error creating feedback for run %s: %s", item["run_id"], e)
+    
+    logger.debug("Submitted %d feedback item(s) to LangSmith", len(batch))
+
+
+# Background feedback worker state
+_feedback_queue: Optional[asyncio.Queue] = None
+_feedback_loop: Optional[asyncio.AbstractEventLoop] = None
+_feedback_task: Optional[asyncio.Task] = None
+
+# Queued by stop_feedback_worker(); the worker submits what it holds and exits
+_STOP_FEEDBACK = object()
+
+
+async def _drain_feedback_queue(queue: asyncio.Queue):
+    """Collect queued feedback into batches and submit them off the event loop."""
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        item = await queue.get()
+        if item is _STOP_FEEDBACK:
+            return
+        
+        batch = [item]
+        stopping = False
+        deadline = loop.time() + FEEDBACK_FLUSH_INTERVAL
+        
+        while len(batch) < FEEDBACK_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP_FEEDBACK:
+                stopping = True
+                break
+            batch.append(item)
+        
+        await asyncio.to_thread(_submit_feedback_batch, batch)
+        if stopping:
+            return
+
+
+def start_feedback_worker() -> Optional[asyncio.Task]:
+    """
+    Start the background task that batches feedback submissions.
+    
+    Must be called from within a running event loop (e.g. app lifespan).
+    
+    Returns:
+        The worker task, or None if LangSmith is disabled
+    """
+    global _feedback_queue, _feedback_loop, _feedback_task
+    
+    if not get_langsmith_config().is_enabled() or _feedback_task is not None:
+        return _feedback_task
+    
+    _feedback_queue = asyncio.Queue()
+    _feedback_loop = asyncio.get_running_loop()
+    _feedback_task = asyncio.create_task(_drain_feedback_queue(_feedback_queue))
+    
+    logger.info("LangSmith feedback worker started")
+    return _feedback_task
+
+
+async def stop_feedback_worker():
+    """
+    Stop the feedback worker, submitting everything queued before the call.
+    
+    The worker is stopped with a sentinel rather than cancelled, so a batch
+    it is still collecting is submitted instead of dropped.
+    """
+    global _feedback_queue, _feedback_loop, _feedback_task
+    
+    if _feedback_task is None:
+        return
+    
+    _feedback_queue.put_nowait(_STOP_FEEDBACK)
+    await _feedback_task
+    
+    # Items that arrived (from other threads) after the sentinel
+    remaining = []
+    while not _feedback_queue.empty():
+        remaining.append(_feedback_queue.get_nowait())
+    
+    _feedback_queue = None
+    _feedback_loop = None
+    _feedback_task = None
+    
+    if remaining:
+        await asyncio.to_thread(_submit_feedback_batch, remaining)
+    
+    logger.info("LangSmith feedback worker stopped")
 
 
-# Initialize LangSmith on module import
+# Nothing is initialized on import; the client is created by get_langsmith_config()
 logger.info("LangSmith observability module loaded")
 
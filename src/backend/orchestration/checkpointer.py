@@ -0,0 +1,128 @@
+"""
+Deferred checkpointing for LangGraph workflows.
+Buffers per-step checkpoints in memory and materializes only the latest one.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredMemorySaver(MemorySaver):
+    """
+    MemorySaver that defers checkpoint serialization until it is needed.
+
+    LangGraph saves a checkpoint after every step, and MemorySaver serializes
+    the full AgentState each time. Only the latest checkpoint of a thread is
+    ever read back, so this saver keeps just the most recent checkpoint (and
+    its pending writes) per thread and serializes it once, on flush() or when
+    the thread's state is read.
+
+    MemorySaver only stores the channel values listed in new_versions, so the
+    new_versions of all buffered steps are merged, and the flushed checkpoint
+    is parented on the last checkpoint that was actually saved.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._buffer: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._buffer_lock = threading.Lock()
+
+    @staticmethod
+    def _buffer_key(config: RunnableConfig) -> Tuple[str, str]:
+        configurable = config["configurable"]
+        return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Buffer the checkpoint, replacing any earlier unflushed one for the thread."""
+        thread_id, checkpoint_ns = self._buffer_key(config)
+
+        with self._buffer_lock:
+            previous = self._buffer.get((thread_id, checkpoint_ns))
+            if previous is None:
+                # The config of the first buffered step points at the last saved checkpoint
+                parent_config, versions = config, dict(new_versions)
+            else:
+                parent_config, versions = previous["parent_config"], previous["new_versions"]
+                versions.update(new_versions)
+
+            self._buffer[(thread_id, checkpoint_ns)] = {
+                "parent_config": parent_config,
+                "checkpoint": checkpoint,
+                "metadata": metadata,
+                "new_versions": versions,
+                "writes": []
+            }
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Buffer pending writes that belong to the buffered checkpoint."""
+        key = self._buffer_key(config)
+
+        with self._buffer_lock:
+            pending = self._buffer.get(key)
+            if pending is not None:
+                pending["writes"].append((config, writes, task_id, task_path))
+                return
+
+        super().put_writes(config, writes, task_id, task_path)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Materialize any buffered checkpoint for the thread before reading it."""
+        self.flush(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def flush(self, thread_id: Optional[str] = None):
+        """
+        Serialize buffered checkpoints into the underlying MemorySaver.
+
+        Args:
+            thread_id: Only flush this thread (all threads if None)
+        """
+        with self._buffer_lock:
+            keys = [key for key in self._buffer if thread_id is None or key[0] == thread_id]
+            pending: List[Dict[str, Any]] = [self._buffer.pop(key) for key in keys]
+
+        for entry in pending:
+            saved_config = super().put(
+                entry["parent_config"], entry["checkpoint"], entry["metadata"], entry["new_versions"]
+            )
+            saved_id = saved_config["configurable"]["checkpoint_id"]
+
+            # Writes recorded against superseded checkpoints were never materialized
+            for config, writes, task_id, task_path in entry["writes"]:
+                if config["configurable"].get("checkpoint_id") == saved_id:
+                    super().put_writes(config, writes, task_id, task_path)
+
+        if pending:
+            logger.debug(f"Flushed {len(pending)} deferred checkpoint(s)")
@@ -3,14 +3,26 @@ LangGraph workflow builder for multi-agent orchestration.
 Creates and compiles the LangGraph with proper routing and conditional edges.
 """
 
+import asyncio
 import logging
-from typing import Literal, Dict, Any, List, cast
+import threading
+from functools import cached_property
+from typing import ClassVar, Dict, Any, List, Optional, TypedDict, cast
 from datetime import datetime
+from time import time_ns
+from types import MappingProxyType
 
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 
-from orchestration.state import AgentState, update_state_status, mark_task_completed
+from orchestration.state import (
+    AGENT_BITS,
+    AgentState,
+    RunContext,
+    mark_task_completed,
+    pending_agents,
+    update_state_status,
+)
+from orchestration.checkpointer import DeferredMemorySaver
 from agents.specialized.lead_researcher import LeadResearcherAgent
 from agents.specialized.synthesizer import SynthesizerAgent
 from agents.specialized.data_collector import DataCollectorAgent
@@ -20,9 +32,108 @@ from agents.specialized.straight_through_llm import StraightThroughLLMAgent
 from agents.specialized.writer import WriterAgent
 from agents.specialized.cost_calculator import CostCalculatorAgent
 from utils.contribution_tracker import create_contribution_tracker, get_contribution_tracker
+from observability.langsmith_config import TrackedSession
 
 logger = logging.getLogger(__name__)
 
+# Log banners, built once instead of on every node call
+_BANNER = "=" * 80
+_LEAD_RESEARCHER_BANNER = f"{_BANNER}\n🎯 NODE: Lead Researcher (Orchestration & Strategy)\n{_BANNER}"
+_SYNTHESIZER_BANNER = f"{_BANNER}\n📝 NODE: Synthesizer (Report Structure Generation)\n{_BANNER}"
+_DATA_COLLECTOR_BANNER = f"{_BANNER}\n🌐 NODE: Data Collector (Web Research)\n{_BANNER}"
+_API_RESEARCHER_BANNER = f"{_BANNER}\n🔌 NODE: API Researcher (External Data Collection)\n{_BANNER}"
+_ANALYST_BANNER = f"{_BANNER}\n📊 NODE: Analyst (Data Analysis & Visualizations)\n{_BANNER}"
+_STRAIGHT_THROUGH_LLM_BANNER = f"{_BANNER}\n🤖 NODE: Straight-Through-LLM (Direct Content Generation)\n{_BANNER}"
+_PARALLEL_RESEARCH_BANNER = f"{_BANNER}\n⚡ NODE: Parallel Research (Data, API, Analysis, LLM)\n{_BANNER}"
+_WRITER_BANNER = f"{_BANNER}\n✍️  NODE: Writer (Report Generation)\n{_BANNER}"
+_WORKFLOW_START_BANNER = f"{_BANNER}\n🚀 STARTING WORKFLOW EXECUTION\n{_BANNER}"
+_WORKFLOW_COMPLETE_BANNER = f"{_BANNER}\n✅ WORKFLOW EXECUTION COMPLETED\n{_BANNER}"
+_WORKFLOW_FAILED_BANNER = f"{_BANNER}\n❌ WORKFLOW EXECUTION FAILED\n{_BANNER}"
+
+# Required agents for each combination of optional agents, indexed by
+# data_collector (bit 0) | api_researcher (bit 1) | analyst (bit 2).
+# straight_through_llm is ALWAYS required - guaranteed content generation.
+_REQUIRED_AGENTS_TABLE = tuple(
+    tuple(
+        agent
+        for bit, agent in enumerate(("data_collector", "api_researcher", "analyst"))
+        if mask & (1 << bit)
+    ) + ("straight_through_llm",)
+    for mask in range(8)
+)
+
+_STATUS_ERROR = "error"
+
+# Shared read-only stand-in for missing mappings (never mutated by callers)
+_EMPTY_DICT = MappingProxyType({})
+
+
+class _NodeReturn(TypedDict, total=False):
+    """Keys shared by the partial state updates that workflow nodes return."""
+    status: str
+    current_agent: str
+    completed_tasks: List[str]
+    agent_completion_status: int
+    errors: List[Dict[str, Any]]
+    citations: List[Dict[str, Any]]
+    run_context: RunContext
+
+
+def _node_error(agent: str, error: BaseException) -> _NodeReturn:
+    """Build the state update a node returns when its agent fails."""
+    return {
+        "status": _STATUS_ERROR,
+        "errors": [{
+            "agent": agent,
+            "message": str(error),
+            "timestamp": _iso_now()
+        }]
+    }
+
+
+# State keys whose reducers append (append_list, bounded_errors) or OR bits (operator.or_); everything else is last-wins
+_APPEND_KEYS = ("citations", "completed_tasks", "errors")
+_OR_KEYS = ("agent_completion_status",)
+_ACCUMULATED_KEYS = frozenset(_APPEND_KEYS + _OR_KEYS)
+
+# (epoch second, ISO string) of the last formatted error timestamp
+_iso_cache = (0, "")
+
+
+def _iso_now() -> str:
+    """
+    Current local time as an ISO 8601 string with second resolution.
+    
+    The string is only re-formatted when the second changes, so bursts of
+    node errors reuse the same timestamp instead of building a datetime each.
+    """
+    global _iso_cache
+    second = time_ns() // 1_000_000_000
+    cached_second, cached = _iso_cache
+    if second != cached_second:
+        cached = datetime.fromtimestamp(second).isoformat()
+        _iso_cache = (second, cached)
+    return cached
+
+
+def _merge_node_result(merged: Dict[str, Any], patch: Dict[str, Any]) -> None:
+    """
+    Fold one node's update into an accumulated update in place.
+    
+    List fields are extended, completion bits are OR-ed and the remaining
+    keys are applied with a single dict.update, so the combined update reaches
+    LangGraph's per-field reducers once instead of once per node.
+    """
+    for key in _APPEND_KEYS:
+        value = patch.get(key)
+        if value:
+            merged[key] += value
+    for key in _OR_KEYS:
+        value = patch.get(key)
+        if value:
+            merged[key] = merged.get(key, 0) | value
+    merged.update({key: value for key, value in patch.items() if key not in _ACCUMULATED_KEYS})
+
 
 class MultiAgentWorkflow:
     """
@@ -30,23 +141,84 @@ class MultiAgentWorkflow:
     Coordinates specialized agents for market research report generation.
     """
     
+    # Exact subtask agent_type -> agent mapping
+    _AGENT_TYPE_MAP = {
+        "data_collector": "data_collector",
+        "researcher": "data_collector",
+        "web_researcher": "data_collector",
+        "api": "api_researcher",
+        "api_researcher": "api_researcher",
+        "analyst": "analyst",
+        "analysis": "analyst"
+    }
+    
+    # Fallback substring matches for free-form agent types, checked in order
+    _AGENT_TYPE_PATTERNS = (
+        ("data_collector", "data_collector"),
+        ("researcher", "data_collector"),
+        ("api", "api_researcher"),
+        ("analyst", "analyst"),
+        ("analysis", "analyst")
+    )
+    
+    # Compiled graph and its checkpointer, shared by every workflow instance.
+    # Nodes are bound to the instance that built the graph, so per-run state the
+    # nodes touch (the tracker cache) lives on the class as well.
+    _compiled_graph: ClassVar[Optional[Any]] = None
+    _shared_memory: ClassVar[Optional[DeferredMemorySaver]] = None
+    _compile_lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    # Contribution trackers for in-flight sessions (session_id is fixed for a run)
+    _tracker_cache: ClassVar[Dict[str, Any]] = {}
+    
     def __init__(self):
         """Initialize the multi-agent workflow."""
-        # Initialize agents
-        self.lead_researcher = LeadResearcherAgent()
-        self.synthesizer = SynthesizerAgent()
-        self.data_collector = DataCollectorAgent()
-        self.api_researcher = APIResearcherAgent()
-        self.analyst = AnalystAgent()
-        self.straight_through_llm = StraightThroughLLMAgent()
-        self.writer = WriterAgent()
-        self.cost_calculator = CostCalculatorAgent()
-        
-        # Build graph
-        self.graph = self._build_graph()
+        # Agents are created lazily on first use (see the properties below)
+        
+        # Build the graph once and reuse it for later instances
+        cls = type(self)
+        with cls._compile_lock:
+            if cls._compiled_graph is None:
+                cls._compiled_graph = self._build_graph()
+                cls._shared_memory = self.memory
+        self.graph = cls._compiled_graph
+        self.memory = cls._shared_memory
         
         logger.info("Multi-Agent Workflow initialized with 8 specialized agents")
     
+    # Specialized agents - constructed on first access and reused afterwards
+    @cached_property
+    def lead_researcher(self) -> LeadResearcherAgent:
+        return LeadResearcherAgent()
+    
+    @cached_property
+    def synthesizer(self) -> SynthesizerAgent:
+        return SynthesizerAgent()
+    
+    @cached_property
+    def data_collector(self) -> DataCollectorAgent:
+        return DataCollectorAgent()
+    
+    @cached_property
+    def api_researcher(self) -> APIResearcherAgent:
+        return APIResearcherAgent()
+    
+    @cached_property
+    def analyst(self) -> AnalystAgent:
+        return AnalystAgent()
+    
+    @cached_property
+    def straight_through_llm(self) -> StraightThroughLLMAgent:
+        return StraightThroughLLMAgent()
+    
+    @cached_property
+    def writer(self) -> WriterAgent:
+        return WriterAgent()
+    
+    @cached_property
+    def cost_calculator(self) -> CostCalculatorAgent:
+        return CostCalculatorAgent()
+    
     def _build_graph(self) -> StateGraph:
         """
         Build the LangGraph workflow.
@@ -58,102 +230,100 @@ class MultiAgentWorkflow:
         workflow = StateGraph(AgentState)
         
         # Add nodes
-        workflow.add_node("cost_calculator", self._cost_calculator_node)
-        workflow.add_node("lead_researcher", self._lead_researcher_node)
+        workflow.add_node("planning", self._planning_node)  # cost estimate + lead researcher concurrently
         workflow.add_node("synthesizer", self._synthesizer_node)  # Report structure synthesis (runs first)
-        workflow.add_node("data_collector", self._data_collector_node)
-        workflow.add_node("api_researcher", self._api_researcher_node)
-        workflow.add_node("analyst", self._analyst_node)
-        workflow.add_node("straight_through_llm", self._straight_through_llm_node)  # Direct LLM content generation
-        workflow.add_node("check_completion", self._check_completion_node)  # Check if all agents completed
+        workflow.add_node("parallel_research", self._parallel_research_node)  # data, api, analyst, llm concurrently
         workflow.add_node("writer", self._writer_node)
         
-        # Add edges - Updated workflow with proper parallel execution handling
-        # Flow: START → cost → lead → synthesizer → (parallel: data, api, analyst) → check_completion → writer → END
+        # Add edges - research agents fan out concurrently inside parallel_research
+        # Flow: START → planning → synthesizer → parallel_research → writer → END
         # Writer only starts after all parallel agents complete
-        workflow.add_edge(START, "cost_calculator")
-        workflow.add_conditional_edges(
-            "cost_calculator",
-            self._route_after_cost_estimate,
-            {
-                "proceed": "lead_researcher",
-                "high_cost": END
-            }
-        )
-        workflow.add_edge("lead_researcher", "synthesizer")  # Lead → Synthesizer (structure creation)
-        
-        # Synthesizer completes structure, then triggers execution of agents
-        # Execute agents sequentially - they update completion status independently
-        # After all agents execute, check completion and route to writer
-        workflow.add_edge("synthesizer", "data_collector")   # Start data collection
-        
-        # Route from data_collector based on whether API researcher is needed
-        workflow.add_conditional_edges(
-            "data_collector",
-            self._route_after_data_collector,
-            {
-                "to_api": "api_researcher",
-                "to_analyst": "analyst",
-                "to_llm": "straight_through_llm",
-                "to_check": "check_completion"
-            }
-        )
-        
-        # Route from api_researcher to analyst, llm, or check
-        workflow.add_conditional_edges(
-            "api_researcher",
-            self._route_after_api_researcher,
-            {
-                "to_analyst": "analyst",
-                "to_llm": "straight_through_llm",
-                "to_check": "check_completion"
-            }
-        )
-        
-        # Route from analyst to llm or check
-        workflow.add_conditional_edges(
-            "analyst",
-            self._route_after_analyst,
-            {
-                "to_llm": "straight_through_llm",
-                "to_check": "check_completion"
-            }
-        )
-        
-        # Straight-through-LLM always goes to check_completion
-        workflow.add_edge("straight_through_llm", "check_completion")
-        
-        # Completion checker routes to writer if all done, else there's an error
-        workflow.add_conditional_edges(
-            "check_completion",
-            self._route_after_completion_check,
-            {
-                "all_complete": "writer",
-                "incomplete": END  # Should not happen if agents executed sequentially
-            }
-        )
-        
+        workflow.add_edge(START, "planning")
+        # High cost estimates are logged but never stop the run, so the lead
+        # researcher runs alongside the cost calculator and no router is needed
+        workflow.add_edge("planning", "synthesizer")  # Planning → Synthesizer (structure creation)
+        
+        # Synthesizer completes structure, then all research agents run concurrently
+        # (fan-out/fan-in inside a single node), so latency is the slowest agent
+        # rather than the sum of all of them
+        workflow.add_edge("synthesizer", "parallel_research")
+        # parallel_research awaits every agent before returning, so it is the fan-in barrier
+        workflow.add_edge("parallel_research", "writer")
         workflow.add_edge("writer", END)
         
-        # Compile with memory
-        memory = MemorySaver()
-        compiled_graph = workflow.compile(checkpointer=memory)
+        # Compile with memory - checkpoints are buffered and serialized once per run
+        self.memory = DeferredMemorySaver()
+        compiled_graph = workflow.compile(checkpointer=self.memory)
         
         logger.info("LangGraph workflow compiled")
         return compiled_graph
     
+    def _get_tracker(self, session_id: Optional[str]):
+        """Get the contribution tracker for a session, caching the registry lookup."""
+        if not session_id:
+            return None
+        
+        tracker = self._tracker_cache.get(session_id)
+        if tracker is None:
+            tracker = get_contribution_tracker(session_id)
+            if tracker is not None:
+                self._tracker_cache[session_id] = tracker
+        return tracker
+    
+    @staticmethod
+    def _run_context(state: AgentState) -> RunContext:
+        """Get the run context, rebuilding it if the cost calculator did not emit one."""
+        return state.get("run_context") or RunContext.from_state(state)
+    
     # Node implementations
-    def _cost_calculator_node(self, state: AgentState) -> Dict[str, Any]:
+    async def _planning_node(self, state: AgentState) -> _NodeReturn:
+        """
+        Planning node - Cost estimation and research strategy concurrently.
+        
+        The lead researcher does not read the cost estimate, and a high estimate
+        only logs a warning, so both agents run together and their updates are
+        merged in a fixed order (cost first, then strategy).
+        """
+        results = await asyncio.gather(
+            self._cost_calculator_node(state),
+            self._lead_researcher_node(state),
+            return_exceptions=True
+        )
+        
+        merged: _NodeReturn = {
+            "citations": [],
+            "completed_tasks": [],
+            "errors": [],
+            "agent_completion_status": 0
+        }
+        for agent, result in zip(("cost_calculator", "lead_researcher"), results):
+            if isinstance(result, BaseException):
+                logger.error(f"❌ {agent} raised during planning: {result}")
+                result = _node_error(agent, result)
+            _merge_node_result(merged, result)
+        
+        return merged
+    
+    async def _cost_calculator_node(self, state: AgentState) -> _NodeReturn:
         """Cost calculator node."""
         logger.info("Executing cost_calculator node")
         
+        ctx = RunContext.from_state(state)
+        
         try:
-            result = self.cost_calculator.execute(
-                report_requirements=state["report_requirements"]
+            result = await self.cost_calculator.aexecute(
+                report_requirements=ctx.report_requirements
             )
             
+            # For red status (high cost), we could stop or request approval
+            # For now, we proceed but log a warning
+            budget_assessment = result.get("budget_assessment", {})
+            if budget_assessment.get("status") == "red":
+                logger.warning(f"High cost estimate: ${budget_assessment.get('total_cost_usd', 0):.2f}")
+            
             return {
                 "cost_estimate": result,
+                "run_context": ctx,
                 "status": "cost_estimated",
                 "current_agent": "cost_calculator",
                 "completed_tasks": ["cost_estimation"]
@@ -161,33 +331,25 @@ class MultiAgentWorkflow:
             
         except Exception as e:
             logger.error(f"Error in cost_calculator node: {e}")
-            return {
-                "status": "error",
-                "errors": [{
-                    "agent": "cost_calculator",
-                    "message": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }]
-            }
+            result = _node_error("cost_calculator", e)
+            result["run_context"] = ctx
+            return result
     
-    def _lead_researcher_node(self, state: AgentState) -> Dict[str, Any]:
+    async def _lead_researcher_node(self, state: AgentState) -> _NodeReturn:
         """Lead researcher node - Orchestration and strategy."""
-        logger.info("=" * 80)
-        logger.info("🎯 NODE: Lead Researcher (Orchestration & Strategy)")
-        logger.info("=" * 80)
+        logger.info(_LEAD_RESEARCHER_BANNER)
         
         try:
             # Get tracker from registry (not from state - state must be serializable)
-            session_id = state.get("session_id")
-            tracker = get_contribution_tracker(session_id) if session_id else None
+            ctx = self._run_context(state)
+            tracker = self._get_tracker(ctx.session_id)
             
-            result = self.lead_researcher.execute(
-                user_request=state["user_request"],
+            result = await self.lead_researcher.aexecute(
+                user_request=ctx.user_request,
                 context={
-                    "cost_estimate": state.get("cost_estimate"),
-                    "report_requirements": state.get("report_requirements"),
+                    "report_requirements": ctx.report_requirements,
                     "contribution_tracker": tracker,
-                    "session_id": session_id
+                    "session_id": ctx.session_id
                 }
             )
             
@@ -199,23 +361,21 @@ class MultiAgentWorkflow:
             agent_tasks = self._distribute_tasks_to_agents(research_plan, research_strategy)
             
             # Determine which agents are required (will be used for completion checking)
-            required_agents = []
-            if research_strategy.get("agent_breakdown", {}).get("data_collectors", 0) > 0:
-                required_agents.append("data_collector")
-            if research_strategy.get("agent_breakdown", {}).get("api_researchers", 0) > 0:
-                required_agents.append("api_researcher")
-            if research_strategy.get("agent_breakdown", {}).get("analysts", 0) > 0:
-                required_agents.append("analyst")
-            
-            # ALWAYS include straight_through_llm - guaranteed content generation
-            required_agents.append("straight_through_llm")
-            
-            # Initialize completion status
-            agent_completion_status = {agent: False for agent in required_agents}
+            # Without API requests the API researcher has nothing to do, so it is never scheduled
+            breakdown = research_strategy.get("agent_breakdown", {})
+            mask = (
+                (breakdown.get("data_collectors", 0) > 0)
+                | (bool(breakdown.get("api_researchers", 0) > 0 and ctx.report_requirements.get("api_requests")) << 1)
+                | ((breakdown.get("analysts", 0) > 0) << 2)
+            )
+            required_agents = _REQUIRED_AGENTS_TABLE[mask]  # shared immutable tuple, no copy
+            # The table's bit layout matches AGENT_BITS for the three optional agents
+            required_mask = mask | AGENT_BITS["straight_through_llm"]
             
-            logger.info("✅ Lead Researcher completed - Strategy created")
-            logger.info(f"   Task distribution: {len(agent_tasks)} agent groups")
-            logger.info(f"   Required agents: {required_agents}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("✅ Lead Researcher completed - Strategy created")
+                logger.info("   Task distribution: %s agent groups", len(agent_tasks))
+                logger.info("   Required agents: %s", required_agents)
             
             return {
                 "research_plan": research_plan,
@@ -224,19 +384,12 @@ class MultiAgentWorkflow:
                 "completed_tasks": ["research_strategy"],
                 "agent_tasks": agent_tasks,
                 "required_agents": required_agents,
-                "agent_completion_status": agent_completion_status
+                "required_mask": required_mask
             }
             
         except Exception as e:
             logger.error(f"❌ Error in lead_researcher node: {e}")
-            return {
-                "status": "error",
-                "errors": [{
-                    "agent": "lead_researcher",
-                    "message": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }]
-            }
+            return _node_error("lead_researcher", e)
     
     def _distribute_tasks_to_agents(
         self,
@@ -265,13 +418,15 @@ class MultiAgentWorkflow:
         
         # Distribute tasks based on agent_type in subtasks
         for task in subtasks:
-            agent_type = task.get("agent_type", "").lower()
-            if "data_collector" in agent_type or "researcher" in agent_type:
-                agent_tasks["data_collector"].append(task)
-            elif "api" in agent_type:
-                agent_tasks["api_researcher"].append(task)
-            elif "analyst" in agent_type or "analysis" in agent_type:
-                agent_tasks["analyst"].append(task)
+            agent_type = task.get("agent_type", "").lower().strip()
+            target = self._AGENT_TYPE_MAP.get(agent_type)
+            if target is None:
+                target = next(
+                    (agent for pattern, agent in self._AGENT_TYPE_PATTERNS if pattern in agent_type),
+                    None
+                )
+            if target:
+                agent_tasks[target].append(task)
         
         # If no tasks distributed, assign based on strategy
         if not any(agent_tasks.values()):
@@ -292,32 +447,28 @@ class MultiAgentWorkflow:
         
         return agent_tasks
     
-    def _synthesizer_node(self, state: AgentState) -> Dict[str, Any]:
+    def _synthesizer_node(self, state: AgentState) -> _NodeReturn:
         """Synthesizer node - Dynamic report structure generation."""
-        logger.info("=" * 80)
-        logger.info("📝 NODE: Synthesizer (Report Structure Generation)")
-        logger.info("=" * 80)
+        logger.info(_SYNTHESIZER_BANNER)
         
         try:
             # Get tracker from registry
-            session_id = state.get("session_id")
-            tracker = get_contribution_tracker(session_id) if session_id else None
+            ctx = self._run_context(state)
+            tracker = self._get_tracker(ctx.session_id)
             
             # Extract topic and requirements
-            report_reqs = state.get("report_requirements", {})
-            topic = report_reqs.get("topic", state.get("user_request", "Unknown"))
-            detailed_requirements = state.get("user_request", "")
+            topic = ctx.report_requirements.get("topic", ctx.user_request or "Unknown")
             
-            logger.info(f"Creating dynamic report structure for: {topic}")
+            logger.info("Creating dynamic report structure for: %s", topic)
             
             result = self.synthesizer.execute(
                 topic=topic,
-                detailed_requirements=detailed_requirements,
+                detailed_requirements=ctx.user_request or "",
                 context={
-                    "report_requirements": report_reqs,
+                    "report_requirements": ctx.report_requirements,
                     "research_plan": state.get("research_plan"),
                     "contribution_tracker": tracker,
-                    "session_id": session_id
+                    "session_id": ctx.session_id
                 }
             )
             
@@ -325,7 +476,7 @@ class MultiAgentWorkflow:
             total_sections = report_structure.get("total_sections", 0)
             dynamic_sections = report_structure.get("dynamic_sections", 0)
             
-            logger.info(f"✅ Synthesizer completed - {total_sections} sections created ({dynamic_sections} dynamic)")
+            logger.info("✅ Synthesizer completed - %s sections created (%s dynamic)", total_sections, dynamic_sections)
             
             return {
                 "report_structure": report_structure,
@@ -336,55 +487,43 @@ class MultiAgentWorkflow:
             
         except Exception as e:
             logger.error(f"❌ Error in synthesizer node: {e}")
-            return {
-                "status": "error",
-                "errors": [{
-                    "agent": "synthesizer",
-                    "message": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }]
-            }
+            return _node_error("synthesizer", e)
     
-    def _data_collector_node(self, state: AgentState) -> Dict[str, Any]:
+    async def _data_collector_node(self, state: AgentState) -> _NodeReturn:
         """Data collector node - Web scraping and data collection."""
-        logger.info("=" * 80)
-        logger.info("🌐 NODE: Data Collector (Web Research)")
-        logger.info("=" * 80)
+        logger.info(_DATA_COLLECTOR_BANNER)
         
         try:
-            # Get session ID and tracker
-            session_id = state.get("session_id")
-            tracker = get_contribution_tracker(session_id) if session_id else None
+            # Get run context and tracker
+            ctx = self._run_context(state)
+            tracker = self._get_tracker(ctx.session_id)
             
             # Get assigned tasks from lead researcher
             agent_tasks = state.get("agent_tasks", {})
             assigned_tasks = agent_tasks.get("data_collector", [])
             
             # Extract URLs from report requirements or use defaults
-            urls = state["report_requirements"].get("urls", [
+            urls = ctx.report_requirements.get("urls", [
                 "https://example.com/market-data"
             ])
-            topic = state["user_request"]
+            topic = ctx.user_request
             
-            logger.info(f"Collecting web research data for: {topic}")
-            logger.info(f"Assigned tasks: {len(assigned_tasks)}")
-            logger.info(f"URLs to scrape: {len(urls)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Collecting web research data for: %s", topic)
+                logger.info("Assigned tasks: %s", len(assigned_tasks))
+                logger.info("URLs to scrape: %s", len(urls))
             
-            result = self.data_collector.execute(
+            result = await self.data_collector.aexecute(
                 urls=urls,
                 topic=topic,
                 context={
                     "assigned_tasks": assigned_tasks,
                     "contribution_tracker": tracker,
-                    "session_id": session_id
+                    "session_id": ctx.session_id
                 }
             )
             
-            logger.info(f"✅ Data Collector completed - Collected data from {len(urls)} sources")
-            
-            # Mark this agent as complete
-            completion_status = state.get("agent_completion_status", {}).copy()
-            completion_status["data_collector"] = True
+            logger.info("✅ Data Collector completed - Collected data from %s sources", len(urls))
             
             return {
                 "web_research_data": result,
@@ -392,71 +531,57 @@ class MultiAgentWorkflow:
                 "status": "web_research_complete",
                 "current_agent": "data_collector",
                 "completed_tasks": ["web_data_collection"],
-                "agent_completion_status": completion_status
+                "agent_completion_status": AGENT_BITS["data_collector"]
             }
             
         except Exception as e:
             logger.error(f"❌ Error in data_collector node: {e}")
-            return {
-                "status": "error",
-                "errors": [{
-                    "agent": "data_collector",
-                    "message": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }]
-            }
+            return _node_error("data_collector", e)
     
-    def _api_researcher_node(self, state: AgentState) -> Dict[str, Any]:
+    async def _api_researcher_node(self, state: AgentState) -> _NodeReturn:
         """API researcher node - External API data collection."""
-        logger.info("=" * 80)
-        logger.info("🔌 NODE: API Researcher (External Data Collection)")
-        logger.info("=" * 80)
+        logger.info(_API_RESEARCHER_BANNER)
         
         try:
-            # Get session ID and tracker
-            session_id = state.get("session_id")
-            tracker = get_contribution_tracker(session_id) if session_id else None
+            # Get run context and tracker
+            ctx = self._run_context(state)
+            tracker = self._get_tracker(ctx.session_id)
             
             # Get assigned tasks from lead researcher
             agent_tasks = state.get("agent_tasks", {})
             assigned_tasks = agent_tasks.get("api_researcher", [])
             
             # Extract API requests from report requirements
-            api_requests = state["report_requirements"].get("api_requests", [])
-            topic = state["user_request"]
+            api_requests = ctx.report_requirements.get("api_requests", [])
+            topic = ctx.user_request
             
             if not api_requests:
                 logger.info("ℹ️  No API requests specified, skipping API research")
                 # Mark as complete even if skipped
-                completion_status = state.get("agent_completion_status", {}).copy()
-                completion_status["api_researcher"] = True
                 return {
                     "api_research_data": {"status": "skipped"},
                     "status": "api_research_skipped",
                     "current_agent": "api_researcher",
                     "completed_tasks": ["api_data_collection"],
-                    "agent_completion_status": completion_status
+                    "agent_completion_status": AGENT_BITS["api_researcher"]
                 }
             
-            logger.info(f"Collecting API data for: {topic}")
-            logger.info(f"Assigned tasks: {len(assigned_tasks)}")
-            logger.info(f"API requests to process: {len(api_requests)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Collecting API data for: %s", topic)
+                logger.info("Assigned tasks: %s", len(assigned_tasks))
+                logger.info("API requests to process: %s", len(api_requests))
             
-            result = self.api_researcher.execute(
+            result = await self.api_researcher.aexecute(
                 api_requests=api_requests,
                 topic=topic,
                 context={
                     "assigned_tasks": assigned_tasks,
                     "contribution_tracker": tracker,
-                    "session_id": session_id
+                    "session_id": ctx.session_id
                 }
             )
             
-            logger.info(f"✅ API Researcher completed - Processed {len(api_requests)} API requests")
-            
-            # Mark this agent as complete
-            completion_status = state.get("agent_completion_status", {}).copy()
-            completion_status["api_researcher"] = True
+            logger.info("✅ API Researcher completed - Processed %s API requests", len(api_requests))
             
             return {
                 "api_research_data": result,
@@ -464,30 +589,21 @@ class MultiAgentWorkflow:
                 "status": "api_research_complete",
                 "current_agent": "api_researcher",
                 "completed_tasks": ["api_data_collection"],
-                "agent_completion_status": completion_status
+                "agent_completion_status": AGENT_BITS["api_researcher"]
             }
             
         except Exception as e:
             logger.error(f"Error in api_researcher node: {e}")
-            return {
-                "status": "error",
-                "errors": [{
-                    "agent": "api_researcher",
-                    "message": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }]
-            }
+            return _node_error("api_researcher", e)
     
-    def _analyst_node(self, state: AgentState) -> Dict[str, Any]:
+    async def _analyst_node(self, state: AgentState) -> _NodeReturn:
         """Analyst node - Data analysis and visualization generation."""
-        logger.info("=" * 80)
-        logger.info("📊 NODE: Analyst (Data Analysis & Visualizations)")
-        logger.info("=" * 80)
+        logger.info(_ANALYST_BANNER)
         
         try:
-            # Get session ID and tracker
-            session_id = state.get("session_id")
-            tracker = get_contribution_tracker(session_id) if session_id else None
+            # Get run context and tracker
+            ctx = self._run_context(state)
+            tracker = self._get_tracker(ctx.session_id)
             
             # Get assigned tasks from lead researcher
             agent_tasks = state.get("agent_tasks", {})
@@ -500,33 +616,30 @@ class MultiAgentWorkflow:
                 "data_sources": []
             }
             
-            topic = state["user_request"]
-            report_reqs = state.get("report_requirements", {})
+            topic = ctx.user_request
+            report_reqs = ctx.report_requirements
             
-            logger.info(f"Analyzing data for: {topic}")
-            logger.info(f"Assigned tasks: {len(assigned_tasks)}")
-            logger.info(f"Analysis requested: {report_reqs.get('include_analysis', True)}")
-            logger.info(f"Visualizations requested: {report_reqs.get('include_visualizations', True)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Analyzing data for: %s", topic)
+                logger.info("Assigned tasks: %s", len(assigned_tasks))
+                logger.info("Analysis requested: %s", report_reqs.get('include_analysis', True))
+                logger.info("Visualizations requested: %s", report_reqs.get('include_visualizations', True))
             
-            result = self.analyst.execute(
+            result = await self.analyst.aexecute(
                 research_data=research_data,
                 topic=topic,
                 context={
                     "assigned_tasks": assigned_tasks,
                     "report_requirements": report_reqs,
                     "contribution_tracker": tracker,
-                    "session_id": session_id
+                    "session_id": ctx.session_id
                 }
             )
             
             visualizations = result.get("visualizations", [])
             insights = result.get("insights", [])
             
-            logger.info(f"✅ Analyst completed - Generated {len(insights)} insights, {len(visualizations)} visualizations")
-            
-            # Mark this agent as complete
-            completion_status = state.get("agent_completion_status", {}).copy()
-            completion_status["analyst"] = True
+            logger.info("✅ Analyst completed - Generated %s insights, %s visualizations", len(insights), len(visualizations))
             
             return {
                 "analysis_results": result.get("analysis"),
@@ -535,34 +648,25 @@ class MultiAgentWorkflow:
                 "status": "analysis_complete",
                 "current_agent": "analyst",
                 "completed_tasks": ["data_analysis"],
-                "agent_completion_status": completion_status
+                "agent_completion_status": AGENT_BITS["analyst"]
             }
             
         except Exception as e:
             logger.error(f"❌ Error in analyst node: {e}")
-            return {
-                "status": "error",
-                "errors": [{
-                    "agent": "analyst",
-                    "message": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }]
-            }
+            return _node_error("analyst", e)
     
-    def _straight_through_llm_node(self, state: AgentState) -> Dict[str, Any]:
+    async def _straight_through_llm_node(self, state: AgentState) -> _NodeReturn:
         """Straight-Through-LLM node - Direct content generation using LLM foundational knowledge."""
-        logger.info("=" * 80)
-        logger.info("🤖 NODE: Straight-Through-LLM (Direct Content Generation)")
-        logger.info("=" * 80)
+        logger.info(_STRAIGHT_THROUGH_LLM_BANNER)
         
         try:
-            # Get session ID and tracker
-            session_id = state.get("session_id")
-            tracker = get_contribution_tracker(session_id) if session_id else None
+            # Get run context and tracker
+            ctx = self._run_context(state)
+            tracker = self._get_tracker(ctx.session_id)
             
             # Get inputs
             report_structure = state.get("report_structure")
-            user_requirements = state.get("report_requirements")
+            user_requirements = ctx.report_requirements
             
             if not report_structure:
                 logger.error("No report structure available - Synthesizer must run first!")
@@ -578,69 +682,104 @@ class MultiAgentWorkflow:
             topic = user_requirements.get("topic", "Unknown")
             sections_count = len(report_structure.get("sections", []))
             
-            logger.info(f"Generating comprehensive content for: {topic[:80]}")
-            logger.info(f"Report structure: {sections_count} sections")
-            logger.info(f"Page count target: {user_requirements.get('page_count', 10)}")
-            logger.info(f"Complexity: {user_requirements.get('complexity', 'medium')}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Generating comprehensive content for: %s", topic[:80])
+                logger.info("Report structure: %s sections", sections_count)
+                logger.info("Page count target: %s", user_requirements.get('page_count', 10))
+                logger.info("Complexity: %s", user_requirements.get('complexity', 'medium'))
             
-            result = self.straight_through_llm.execute(
+            result = await self.straight_through_llm.aexecute(
                 report_structure=report_structure,
                 user_requirements=user_requirements,
                 research_data=research_data,
                 context={
                     "contribution_tracker": tracker,
-                    "session_id": session_id
+                    "session_id": ctx.session_id
                 }
             )
             
             sections_generated = result.get("sections_generated", 0)
             total_words = result.get("total_word_count", 0)
             
-            logger.info(f"✅ Straight-Through-LLM completed - Generated {sections_generated} sections, {total_words} words")
-            
-            # Mark this agent as complete
-            completion_status = state.get("agent_completion_status", {}).copy()
-            completion_status["straight_through_llm"] = True
+            logger.info("✅ Straight-Through-LLM completed - Generated %s sections, %s words", sections_generated, total_words)
             
             return {
                 "llm_generated_content": result,
                 "status": "llm_content_complete",
                 "current_agent": "straight_through_llm",
                 "completed_tasks": ["llm_content_generation"],
-                "agent_completion_status": completion_status
+                "agent_completion_status": AGENT_BITS["straight_through_llm"]
             }
             
         except Exception as e:
             logger.error(f"❌ Error in straight_through_llm node: {e}")
             # Even on error, mark as complete to not block workflow
-            completion_status = state.get("agent_completion_status", {}).copy()
-            completion_status["straight_through_llm"] = True
-            return {
-                "status": "error",
-                "agent_completion_status": completion_status,
-                "errors": [{
-                    "agent": "straight_through_llm",
-                    "message": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }]
-            }
+            result = _node_error("straight_through_llm", e)
+            result["agent_completion_status"] = AGENT_BITS["straight_through_llm"]
+            return result
     
-    def _writer_node(self, state: AgentState) -> Dict[str, Any]:
+    async def _parallel_research_node(self, state: AgentState) -> _NodeReturn:
+        """
+        Parallel research node - Fan out independent research agents concurrently.
+        
+        Data collection, API research, analysis and straight-through LLM content
+        generation only depend on the synthesizer's output, so they run together
+        and their updates are merged once every agent has finished.
+        """
+        logger.info(_PARALLEL_RESEARCH_BANNER)
+        
+        required_mask = state.get("required_mask", 0)
+        
+        # Data collector and straight-through LLM always run; others only when required
+        branches = {"data_collector": self._data_collector_node(state)}
+        if required_mask & AGENT_BITS["api_researcher"]:
+            branches["api_researcher"] = self._api_researcher_node(state)
+        if required_mask & AGENT_BITS["analyst"]:
+            branches["analyst"] = self._analyst_node(state)
+        branches["straight_through_llm"] = self._straight_through_llm_node(state)
+        
+        logger.info("   Launching %s agents concurrently: %s", len(branches), list(branches))
+        
+        results = await asyncio.gather(*branches.values(), return_exceptions=True)
+        
+        # Merge branch updates in a fixed order so the outcome is deterministic
+        merged: _NodeReturn = {
+            "citations": [],
+            "completed_tasks": [],
+            "errors": [],
+            "agent_completion_status": 0
+        }
+        for agent, result in zip(branches, results):
+            if isinstance(result, BaseException):
+                logger.error(f"❌ {agent} raised during parallel research: {result}")
+                result = _node_error(agent, result)
+            
+            _merge_node_result(merged, result)
+        
+        merged["current_agent"] = "parallel_research"
+        
+        # Agents that failed never mark themselves complete; the writer still runs on partial data
+        pending = required_mask & ~merged["agent_completion_status"]
+        if pending:
+            logger.warning(f"⚠️  Agents did not complete: {pending_agents(pending)}")
+        
+        logger.info("✅ Parallel research completed - %s tasks, %s errors", len(merged['completed_tasks']), len(merged['errors']))
+        return merged
+    
+    def _writer_node(self, state: AgentState) -> _NodeReturn:
         """Writer node - Final report generation (Markdown, HTML, PDF).
         
         This node only executes after ALL parallel agents (data_collector, api_researcher, analyst)
-        have completed their tasks. The dependency is enforced by conditional routing.
+        have completed their tasks. The dependency is enforced by the parallel_research fan-in.
         """
-        logger.info("=" * 80)
-        logger.info("✍️  NODE: Writer (Report Generation)")
-        logger.info("=" * 80)
+        logger.info(_WRITER_BANNER)
         logger.info("✅ All parallel agents have completed - Starting final report synthesis")
         
         # Verify all agents completed
-        required_agents = state.get("required_agents", [])
-        completion_status = state.get("agent_completion_status", {})
-        logger.info(f"   Required agents: {required_agents}")
-        logger.info(f"   All completed: {all(completion_status.get(agent, False) for agent in required_agents)}")
+        if logger.isEnabledFor(logging.INFO):
+            pending = state.get("required_mask", 0) & ~state.get("agent_completion_status", 0)
+            logger.info("   Required agents: %s", state.get("required_agents", []))
+            logger.info("   All completed: %s", pending == 0)
         
         try:
             # Get report structure from Synthesizer (or use fallback)
@@ -656,43 +795,46 @@ class MultiAgentWorkflow:
                 }
             else:
                 total_sections = report_structure.get("total_sections", 0)
-                logger.info(f"Using Synthesizer structure with {total_sections} sections")
-            
-            research_findings = {
-                "web_data": state.get("web_research_data"),
-                "api_data": state.get("api_research_data"),
-                "llm_content": state.get("llm_generated_content")  # Content from Straight-Through-LLM
-            }
+                logger.info("Using Synthesizer structure with %s sections", total_sections)
             
+            web_data = state.get("web_research_data")
+            api_data = state.get("api_research_data")
             analysis_results = state.get("analysis_results")
             citations = state.get("citations", [])
             
-            logger.info(f"Generating report for: {state['user_request'][:80]}...")
-            logger.info(f"   Report structure: {report_structure is not None} (sections: {len(report_structure.get('sections', [])) if report_structure else 0})")
-            logger.info(f"   Research findings: web_data={research_findings.get('web_data') is not None}, api_data={research_findings.get('api_data') is not None}")
-            logger.info(f"   Analysis results: {analysis_results is not None}")
-            logger.info(f"   Citations count: {len(citations)}")
+            ctx = self._run_context(state)
+            
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Generating report for: %s...", ctx.user_request[:80])
+                logger.info("   Report structure: True (sections: %s)", len(report_structure.get('sections', [])))
+                logger.info("   Research findings: web_data=%s, api_data=%s", web_data is not None, api_data is not None)
+                logger.info("   Analysis results: %s", analysis_results is not None)
+                logger.info("   Citations count: %s", len(citations))
             
-            # Get session ID and tracker
-            session_id = state.get("session_id")
-            tracker = get_contribution_tracker(session_id) if session_id else None
+            # Get tracker
+            tracker = self._get_tracker(ctx.session_id)
             
             result = self.writer.execute(
                 report_structure=report_structure,
-                research_findings=research_findings,
-                analysis_results=analysis_results or {},  # Ensure not None
+                research_findings={
+                    "web_data": web_data,
+                    "api_data": api_data,
+                    "llm_content": state.get("llm_generated_content")  # Content from Straight-Through-LLM
+                },
+                analysis_results=analysis_results or _EMPTY_DICT,  # Ensure not None
                 citations=citations,
                 context={
-                    "topic": state["user_request"],
-                    "report_requirements": state.get("report_requirements", {}),
+                    "topic": ctx.user_request,
+                    "report_requirements": ctx.report_requirements,
                     "contribution_tracker": tracker,
-                    "session_id": session_id
+                    "session_id": ctx.session_id
                 }
             )
             
-            logger.info(f"✅ Writer completed - Report generated (MD + HTML + PDF)")
-            logger.info(f"   Report path: {result.get('report_path')}")
-            logger.info(f"   PDF path: {result.get('pdf_path')}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("✅ Writer completed - Report generated (MD + HTML + PDF)")
+                logger.info("   Report path: %s", result.get('report_path'))
+                logger.info("   PDF path: %s", result.get('pdf_path'))
             
             return {
                 "report_content": {
@@ -708,153 +850,7 @@ class MultiAgentWorkflow:
             
         except Exception as e:
             logger.error(f"❌ Error in writer node: {e}")
-            return {
-                "status": "error",
-                "errors": [{
-                    "agent": "writer",
-                    "message": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }]
-            }
-    
-    def _route_after_data_collector(self, state: AgentState) -> Literal["to_api", "to_analyst", "to_llm", "to_check"]:
-        """Route after data collector - determine next agent based on requirements."""
-        required_agents = state.get("required_agents", [])
-        completion_status = state.get("agent_completion_status", {})
-        
-        if "api_researcher" in required_agents and not completion_status.get("api_researcher", False):
-            logger.info("   → Routing to API Researcher")
-            return "to_api"
-        elif "analyst" in required_agents and not completion_status.get("analyst", False):
-            logger.info("   → Routing to Analyst")
-            return "to_analyst"
-        elif "straight_through_llm" in required_agents and not completion_status.get("straight_through_llm", False):
-            logger.info("   → Routing to Straight-Through-LLM")
-            return "to_llm"
-        else:
-            logger.info("   → All agents complete, routing to completion check")
-            return "to_check"
-    
-    def _route_after_api_researcher(self, state: AgentState) -> Literal["to_analyst", "to_llm", "to_check"]:
-        """Route after API researcher - go to analyst, llm, or check based on requirements."""
-        required_agents = state.get("required_agents", [])
-        completion_status = state.get("agent_completion_status", {})
-        
-        if "analyst" in required_agents and not completion_status.get("analyst", False):
-            logger.info("   → Routing to Analyst")
-            return "to_analyst"
-        elif "straight_through_llm" in required_agents and not completion_status.get("straight_through_llm", False):
-            logger.info("   → Routing to Straight-Through-LLM")
-            return "to_llm"
-        else:
-            logger.info("   → All remaining agents complete, routing to completion check")
-            return "to_check"
-    
-    def _route_after_analyst(self, state: AgentState) -> Literal["to_llm", "to_check"]:
-        """Route after analyst - go to straight-through-LLM or check completion."""
-        required_agents = state.get("required_agents", [])
-        completion_status = state.get("agent_completion_status", {})
-        
-        if "straight_through_llm" in required_agents and not completion_status.get("straight_through_llm", False):
-            logger.info("   → Routing to Straight-Through-LLM")
-            return "to_llm"
-        else:
-            logger.info("   → All agents complete, routing to completion check")
-            return "to_check"
-    
-    def _check_completion_node(self, state: AgentState) -> Dict[str, Any]:
-        """
-        Check completion node - verifies if all required agents have completed.
-        This node is called after all agents execute.
-        It doesn't modify state, just checks and logs.
-        """
-        required_agents = state.get("required_agents", [])
-        completion_status = state.get("agent_completion_status", {})
-        
-        logger.info("=" * 80)
-        logger.info("🔍 CHECK COMPLETION NODE")
-        logger.info("=" * 80)
-        logger.info(f"   Required agents: {required_agents}")
-        logger.info(f"   Completion status: {completion_status}")
-        
-        # Count completed agents
-        completed_count = sum(1 for agent in required_agents if completion_status.get(agent, False))
-        logger.info(f"   Completed: {completed_count}/{len(required_agents)} agents")
-        
-        # Verify all are complete
-        for agent in required_agents:
-            if completion_status.get(agent, False):
-                logger.info(f"   ✅ {agent}: COMPLETE")
-            else:
-                logger.error(f"   ❌ {agent}: INCOMPLETE")
-        
-        # Return empty dict - state is already updated by the agents
-        return {}
-    
-    def _route_after_completion_check(self, state: AgentState) -> Literal["all_complete", "incomplete"]:
-        """
-        Route after completion check.
-        Check if all required agents have finished before proceeding to writer.
-        This is called after the check_completion node.
-        
-        Args:
-            state: Current state
-            
-        Returns:
-            "all_complete" if all agents done, "incomplete" otherwise (should not happen)
-        """
-        required_agents = state.get("required_agents", [])
-        completion_status = state.get("agent_completion_status", {})
-        
-        logger.info("=" * 80)
-        logger.info("🔍 FINAL COMPLETION CHECK")
-        logger.info("=" * 80)
-        logger.info(f"   Required agents: {required_agents}")
-        logger.info(f"   Completion status: {completion_status}")
-        
-        # Check if all required agents are complete
-        all_complete = all(
-            completion_status.get(agent, False) 
-            for agent in required_agents
-        )
-        
-        if all_complete:
-            logger.info("✅✅✅ ALL REQUIRED AGENTS COMPLETED - Routing to Writer Agent ✅✅✅")
-            return "all_complete"
-        else:
-            incomplete = [agent for agent in required_agents if not completion_status.get(agent, False)]
-            logger.error(f"❌ ERROR: Some agents did not complete: {incomplete}")
-            logger.error(f"   This should not happen with sequential execution!")
-            logger.error(f"   Completion status: {completion_status}")
-            return "incomplete"
-    
-    # Conditional routing
-    def _route_after_cost_estimate(self, state: AgentState) -> Literal["proceed", "high_cost"]:
-        """
-        Route based on cost estimate.
-        
-        Args:
-            state: Current state
-            
-        Returns:
-            Next node to execute
-        """
-        cost_estimate = state.get("cost_estimate", {})
-        
-        if not cost_estimate:
-            return "proceed"
-        
-        budget_assessment = cost_estimate.get("budget_assessment", {})
-        status = budget_assessment.get("status", "green")
-        
-        # For red status (high cost), we could stop or request approval
-        # For now, we'll proceed but log a warning
-        if status == "red":
-            logger.warning(f"High cost estimate: ${budget_assessment.get('total_cost_usd', 0):.2f}")
-            # In production, this might trigger an approval workflow
-            # For now, proceed
-        
-        return "proceed"
+            return _node_error("writer", e)
     
     def execute(
         self,
@@ -874,12 +870,13 @@ class MultiAgentWorkflow:
             Final state dictionary
         """
         try:
-            logger.info(f"Starting workflow execution for session: {session_id}")
+            logger.info("Starting workflow execution for session: %s", session_id)
             
             # Create contribution tracker (stored in registry, not in state)
             # LangGraph state must be serializable, but ContributionTracker is not
             topic = report_requirements.get("topic", "Unknown")
             tracker = create_contribution_tracker(session_id, topic)
+            self._tracker_cache[session_id] = tracker
             
             # Create initial state (without tracker - agents will retrieve from registry)
             from orchestration.state import create_initial_state
@@ -892,45 +889,54 @@ class MultiAgentWorkflow:
             # Execute graph with LangSmith tracing
             config = {"configurable": {"thread_id": session_id}}
             
-            logger.info("=" * 80)
-            logger.info("🚀 STARTING WORKFLOW EXECUTION")
-            logger.info("=" * 80)
-            logger.info(f"Session ID: {session_id}")
-            logger.info(f"Topic: {topic}")
-            logger.info(f"Initial state keys: {list(initial_state.keys())}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(_WORKFLOW_START_BANNER)
+                logger.info("Session ID: %s", session_id)
+                logger.info("Topic: %s", topic)
+                logger.info("Initial state keys: %s", list(initial_state.keys()))
             
             # Use stream for better observability (can see each step)
             # But invoke() is simpler for now - we'll add streaming later if needed
             try:
-                final_state = self.graph.invoke(initial_state, config)
-                logger.info("=" * 80)
-                logger.info("✅ WORKFLOW EXECUTION COMPLETED")
-                logger.info("=" * 80)
-                logger.info(f"Final status: {final_state.get('status')}")
-                logger.info(f"Final agent: {final_state.get('current_agent')}")
-                logger.info(f"Completed tasks: {final_state.get('completed_tasks', [])}")
-                logger.info(f"Report path: {final_state.get('report_path')}")
+                # Group all agent traces for this run under a single session root
+                # The graph contains async nodes, so drive it with ainvoke. execute()
+                # is called from a worker thread without a running event loop.
+                with TrackedSession(session_id, "market_research", metadata={"topic": topic}):
+                    try:
+                        final_state = asyncio.run(self.graph.ainvoke(initial_state, config))
+                    finally:
+                        # Materialize the last checkpoint now that the run is over (failed runs
+                        # included, so their buffered entry is not left behind)
+                        self.memory.flush(session_id)
+                # The run context is derived from the inputs; keep it out of persisted state
+                final_state.pop("run_context", None)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(_WORKFLOW_COMPLETE_BANNER)
+                    logger.info("Final status: %s", final_state.get('status'))
+                    logger.info("Final agent: %s", final_state.get('current_agent'))
+                    logger.info("Completed tasks: %s", final_state.get('completed_tasks', []))
+                    logger.info("Report path: %s", final_state.get('report_path'))
             except Exception as e:
-                logger.error("=" * 80)
-                logger.error("❌ WORKFLOW EXECUTION FAILED")
-                logger.error("=" * 80)
+                logger.error(_WORKFLOW_FAILED_BANNER)
                 logger.error(f"Error: {e}", exc_info=True)
                 raise
             
             # Save contribution summary
             try:
                 summary_file = tracker.save_summary()
-                logger.info(f"Contribution summary saved: {summary_file}")
+                logger.info("Contribution summary saved: %s", summary_file)
                 final_state["contribution_summary_path"] = str(summary_file)
             except Exception as e:
                 logger.error(f"Error saving contribution summary: {e}")
             
-            logger.info(f"Workflow execution completed for session: {session_id}")
+            logger.info("Workflow execution completed for session: %s", session_id)
             return final_state
             
         except Exception as e:
             logger.error(f"Error executing workflow: {e}")
             raise
+        finally:
+            self._tracker_cache.pop(session_id, None)
 
 
 def create_workflow() -> MultiAgentWorkflow:
@@ -0,0 +1,109 @@
+"""
+SQLite-backed persistence for session states.
+Stores one MessagePack-encoded row per session in a WAL-mode database.
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import ormsgpack
+
+logger = logging.getLogger(__name__)
+
+# Options for persisted session states; unknown types fall back to str() like json's default=str
+PACK_OPTIONS = ormsgpack.OPT_NON_STR_KEYS | ormsgpack.OPT_SERIALIZE_NUMPY | ormsgpack.OPT_NAIVE_UTC
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS states (
+    session_id TEXT PRIMARY KEY,
+    blob BLOB NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_states_updated_at ON states (updated_at);
+"""
+
+# A queued write: ("put", session_id, blob, updated_at) or ("delete", session_id, None, None)
+StoreOp = Tuple[str, str, Optional[bytes], Optional[str]]
+
+
+def pack_state(state: Dict[str, Any]) -> bytes:
+    """Encode a session state for storage."""
+    return ormsgpack.packb(state, default=str, option=PACK_OPTIONS)
+
+
+def unpack_state(blob: bytes) -> Dict[str, Any]:
+    """Decode a stored session state."""
+    return ormsgpack.unpackb(blob)
+
+
+class SessionStore:
+    """
+    Per-session state store on SQLite.
+
+    Each session is a single row, so saving one session never re-serializes
+    the others. The connection is shared between threads and guarded by a lock.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open (or create) the session database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def load_blobs(self) -> Dict[str, bytes]:
+        """Load every stored session as its encoded blob (decode with unpack_state)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT session_id, blob FROM states").fetchall()
+        return dict(rows)
+
+    def apply(self, ops: Iterable[StoreOp]):
+        """Apply a batch of queued writes in a single transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for op, session_id, blob, updated_at in ops:
+                    if op == "put":
+                        self._conn.execute(
+                            "INSERT INTO states (session_id, blob, updated_at) VALUES (?, ?, ?) "
+                            "ON CONFLICT(session_id) DO UPDATE SET blob = excluded.blob, updated_at = excluded.updated_at",
+                            (session_id, blob, updated_at)
+                        )
+                    elif op == "delete":
+                        self._conn.execute("DELETE FROM states WHERE session_id = ?", (session_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_older_than(self, cutoff: str) -> List[str]:
+        """
+        Delete sessions last updated before a cutoff.
+
+        Args:
+            cutoff: ISO 8601 timestamp; sessions with an older updated_at are removed
+
+        Returns:
+            IDs of the deleted sessions
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "DELETE FROM states WHERE updated_at < ? RETURNING session_id",
+                (cutoff,)
+            ).fetchall()
+        return [session_id for (session_id,) in rows]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
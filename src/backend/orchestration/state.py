@@ -3,15 +3,31 @@ State management for LangGraph orchestration.
 Defines the state schema and update functions for the multi-agent workflow.
 """
 
+import atexit
 import logging
-import json
+import queue
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional, TypedDict, Annotated
+from typing import List, Dict, Any, Optional, Tuple, TypedDict, Annotated, Union
 from datetime import datetime
-from operator import add
+from operator import or_
+
+import orjson
+import ormsgpack
+
+from orchestration.session_store import SessionStore, StoreOp, pack_state, unpack_state
 
 logger = logging.getLogger(__name__)
 
+# Maximum state writes waiting for the background writer before callers block
+WRITE_QUEUE_SIZE = 64
+
+# Most recent errors kept in a session's state; older ones are logged and dropped
+MAX_STATE_ERRORS = 256
+
 
 def take_last_status(left: str, right: str) -> str:
     """
@@ -35,28 +51,100 @@ def take_last_agent(left: Optional[str], right: Optional[str]) -> Optional[str]:
     return left if left else right
 
 
-def merge_completion_status(
-    left: Optional[Dict[str, bool]], 
-    right: Optional[Dict[str, bool]]
-) -> Optional[Dict[str, bool]]:
+def append_list(left: Optional[List[Any]], right: Optional[List[Any]]) -> List[Any]:
     """
-    Reducer function for agent_completion_status field.
-    Merges completion status dictionaries from multiple concurrent updates.
+    Reducer function for append-only list fields.
+    Orders like operator.add but never modifies its inputs: the accumulated
+    list may still be referenced by a buffered checkpoint (DeferredMemorySaver).
+    Updates that append nothing return the existing list without copying it.
     """
-    # Handle None cases
-    if left is None and right is None:
-        return None
-    if left is None:
-        return right
-    if right is None:
-        return left
-    
-    # Merge dictionaries - right takes precedence for overlapping keys
-    merged = left.copy()
-    merged.update(right)
+    if not right:
+        return left if left is not None else []
+    if not left:
+        return list(right)
+    return left + right
+
+
+def bounded_errors(left: Optional[List[Dict[str, Any]]], right: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Reducer function for errors field.
+    Appends like append_list but keeps only the last MAX_STATE_ERRORS entries,
+    so retry storms cannot grow the state without bound.
+    """
+    merged = append_list(left, right)
+    overflow = len(merged) - MAX_STATE_ERRORS
+    if overflow > 0:
+        for error in merged[:overflow]:
+            logger.warning("Dropping old error from state (%s): %s", error.get("agent"), error.get("message"))
+        merged = merged[overflow:]
     return merged
 
 
+@dataclass(frozen=True, slots=True)
+class RunContext:
+    """
+    Immutable per-run inputs shared by every node.
+    Built once by the cost calculator node so downstream nodes read attributes
+    instead of re-fetching the same keys from state.
+    """
+    user_request: str
+    report_requirements: Dict[str, Any]
+    session_id: str
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RunContext":
+        """Build a context from the raw input fields of a state."""
+        return cls(
+            user_request=state["user_request"],
+            report_requirements=state.get("report_requirements") or {},
+            session_id=state.get("session_id")
+        )
+
+
+# Last formatted timestamp and the monotonic time it was taken at
+_TIME_CACHE = {"mono": 0.0, "iso": ""}
+
+# Reuse the cached timestamp for updates within this many seconds of each other
+_TIME_CACHE_WINDOW = 0.001
+
+
+def _now_iso(force: bool = False) -> str:
+    """
+    Current time as an ISO 8601 string, reformatted at most once per millisecond.
+    
+    Args:
+        force: Always take a fresh timestamp (for audit records such as errors)
+    """
+    mono = time.monotonic()
+    if force or mono - _TIME_CACHE["mono"] > _TIME_CACHE_WINDOW:
+        _TIME_CACHE["iso"] = datetime.now().isoformat()
+        _TIME_CACHE["mono"] = mono
+    return _TIME_CACHE["iso"]
+
+
+# Bit assigned to each research agent in required_mask / agent_completion_status
+AGENT_BITS: Dict[str, int] = {
+    "data_collector": 1,
+    "api_researcher": 2,
+    "analyst": 4,
+    "straight_through_llm": 8,
+}
+
+
+def pending_agents(mask: int) -> List[str]:
+    """Expand an agent bitmask back into agent names (for logging)."""
+    return [agent for agent, bit in AGENT_BITS.items() if mask & bit]
+
+
+def completion_status_dict(mask: Any) -> Dict[str, bool]:
+    """Per-agent view of an agent_completion_status bitmask (for logging and the API)."""
+    if isinstance(mask, dict):
+        # Sessions persisted before the bitmask change stored the dict directly
+        return mask
+    mask = mask or 0
+    return {agent: bool(mask & bit) for agent, bit in AGENT_BITS.items()}
+
+
 class AgentState(TypedDict):
     """
     State schema for the multi-agent research workflow.
@@ -88,25 +176,121 @@ class AgentState(TypedDict):
     pdf_path: Optional[str]
     
     # Citations
-    citations: Annotated[List[Dict[str, Any]], add]
+    citations: Annotated[List[Dict[str, Any]], append_list]
     
     # Metadata
     session_id: str
+    run_context: Optional[RunContext]  # Set by the cost calculator node
     status: Annotated[str, take_last_status]  # Use reducer for concurrent updates
     current_agent: Annotated[Optional[str], take_last_agent]  # Use reducer for concurrent updates
-    completed_tasks: Annotated[List[str], add]
-    errors: Annotated[List[Dict[str, Any]], add]
+    completed_tasks: Annotated[List[str], append_list]
+    errors: Annotated[List[Dict[str, Any]], bounded_errors]
     
     # Task Distribution and Completion Tracking
     agent_tasks: Optional[Dict[str, List[Dict[str, Any]]]]  # Tasks distributed to each agent
-    agent_completion_status: Annotated[Optional[Dict[str, bool]], merge_completion_status]  # Track which agents have completed (merged from concurrent updates)
-    required_agents: Optional[List[str]]  # List of agents that must complete before writer
+    agent_completion_status: Annotated[int, or_]  # AGENT_BITS of agents that have completed (OR-ed across concurrent updates)
+    required_agents: Optional[Tuple[str, ...]]  # Agents that must complete before writer
+    required_mask: int  # AGENT_BITS of required_agents
     
     # Timestamps
     started_at: str
     updated_at: str
 
 
+@dataclass(slots=True)
+class AgentStateRecord:
+    """
+    Slotted in-memory form of a stored AgentState.
+    StateManager keeps sessions in this form and builds AgentState dicts only on demand.
+    """
+    
+    # Input
+    user_request: str = ""
+    report_requirements: Dict[str, Any] = field(default_factory=dict)
+    
+    # Research Plan
+    research_plan: Optional[Dict[str, Any]] = None
+    cost_estimate: Optional[Dict[str, Any]] = None
+    
+    # Data Collection
+    web_research_data: Optional[Dict[str, Any]] = None
+    api_research_data: Optional[Dict[str, Any]] = None
+    
+    # Analysis
+    analysis_results: Optional[Dict[str, Any]] = None
+    insights: Optional[List[Dict[str, Any]]] = None
+    visualizations: Optional[List[Dict[str, Any]]] = None
+    
+    # Report
+    report_structure: Optional[Dict[str, Any]] = None
+    llm_generated_content: Optional[Dict[str, Any]] = None
+    report_content: Optional[Any] = None
+    report_path: Optional[str] = None
+    pdf_path: Optional[str] = None
+    
+    # Citations
+    citations: List[Dict[str, Any]] = field(default_factory=list)
+    
+    # Metadata
+    session_id: str = ""
+    status: str = ""
+    current_agent: Optional[str] = None
+    completed_tasks: List[str] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    
+    # Task Distribution and Completion Tracking
+    agent_tasks: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    agent_completion_status: Any = 0  # bitmask (dict for sessions stored before the bitmask change)
+    required_agents: Optional[Tuple[str, ...]] = None
+    required_mask: int = 0
+    
+    # Timestamps
+    started_at: str = ""
+    updated_at: str = ""
+    
+    # Keys outside the schema (e.g. contribution_summary_path added after a run)
+    extra: Dict[str, Any] = field(default_factory=dict)
+    
+    @classmethod
+    def from_typed_dict(cls, state: Dict[str, Any]) -> "AgentStateRecord":
+        """Build a record from an AgentState (or any state dict)."""
+        record = cls()
+        record.update(state)
+        return record
+    
+    def update(self, updates: Dict[str, Any]) -> bool:
+        """
+        Apply state updates, keeping unknown keys in extra.
+        
+        Returns:
+            True if any value actually changed
+        """
+        changed = False
+        for key, value in updates.items():
+            if key in _RECORD_FIELD_SET:
+                if getattr(self, key) != value:
+                    setattr(self, key, value)
+                    changed = True
+            elif self.extra.get(key, _MISSING) != value:
+                self.extra[key] = value
+                changed = True
+        return changed
+    
+    def to_typed_dict(self) -> AgentState:
+        """Materialize an AgentState dict view of this record."""
+        state = {name: getattr(self, name) for name in _RECORD_FIELDS}
+        state.update(self.extra)
+        return state
+
+
+# Placeholder for extra keys a record does not have yet
+_MISSING = object()
+
+# Schema fields of AgentStateRecord in declaration order (extra is not a state key)
+_RECORD_FIELDS = tuple(f.name for f in fields(AgentStateRecord) if f.name != "extra")
+_RECORD_FIELD_SET = frozenset(_RECORD_FIELDS)
+
+
 def create_initial_state(
     user_request: str,
     report_requirements: Dict[str, Any],
@@ -123,7 +307,7 @@ def create_initial_state(
     Returns:
         Initial AgentState
     """
-    now = datetime.now().isoformat()
+    now = _now_iso()
     
     return AgentState(
         # Input
@@ -154,6 +338,7 @@ def create_initial_state(
         
         # Metadata
         session_id=session_id,
+        run_context=None,
         status="initialized",
         current_agent=None,
         completed_tasks=[],
@@ -161,8 +346,9 @@ def create_initial_state(
         
         # Task Distribution
         agent_tasks=None,
-        agent_completion_status=None,
+        agent_completion_status=0,
         required_agents=None,
+        required_mask=0,
         
         # Timestamps
         started_at=now,
@@ -188,7 +374,7 @@ def update_state_status(
     """
     updates = {
         "status": new_status,
-        "updated_at": datetime.now().isoformat()
+        "updated_at": _now_iso()
     }
     
     if current_agent:
@@ -213,7 +399,7 @@ def mark_task_completed(
     """
     return {
         "completed_tasks": [task_id],
-        "updated_at": datetime.now().isoformat()
+        "updated_at": _now_iso()
     }
 
 
@@ -239,12 +425,12 @@ def add_error(
         "agent": agent_name,
         "message": error_message,
         "details": error_details or {},
-        "timestamp": datetime.now().isoformat()
+        "timestamp": _now_iso(force=True)
     }
     
     return {
         "errors": [error_record],
-        "updated_at": datetime.now().isoformat()
+        "updated_at": error_record["timestamp"]
     }
 
 
@@ -268,6 +454,26 @@ def validate_state(state: AgentState) -> bool:
     return True
 
 
+@lru_cache(maxsize=1)
+def _default_persistence_path() -> Path:
+    """Default session database path, derived once from settings."""
+    from config import settings
+    
+    # Derive data directory from reports_dir (./data/reports -> ./data)
+    return Path(settings.reports_dir).parent / "sessions" / "states.db"
+
+
+# Directories already created by this process
+_created_dirs: set = set()
+
+
+def _ensure_dir(directory: Path):
+    """Create a directory once per process, skipping the mkdir syscall afterwards."""
+    if directory not in _created_dirs:
+        directory.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(directory)
+
+
 class StateManager:
     """Manager for state operations and validation with persistence."""
     
@@ -276,51 +482,134 @@ class StateManager:
         Initialize state manager with optional persistence.
         
         Args:
-            persistence_file: Path to file for persisting states
+            persistence_file: Path to the SQLite database for persisting states
         """
-        self.states: Dict[str, AgentState] = {}
+        # Sessions loaded from the store stay encoded until first accessed
+        self.states: Dict[str, Union[AgentStateRecord, bytes]] = {}
+        
+        # Guards self.states while a state is encoded and queued for the background writer
+        self._lock = threading.RLock()
+        
+        # Hash of the last encoded blob per session, used to skip writes that change nothing
+        self._row_hashes: Dict[str, int] = {}
         
         # Set up persistence
-        if persistence_file is None:
-            from config import settings
-            
-            # Derive data directory from reports_dir (./data/reports -> ./data)
-            reports_path = Path(settings.reports_dir)
-            data_dir = reports_path.parent
-            self.persistence_file = data_dir / "sessions" / "states.json"
-        else:
-            self.persistence_file = persistence_file
+        self.persistence_file = persistence_file if persistence_file is not None else _default_persistence_path()
         
         # Ensure directory exists
-        self.persistence_file.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(self.persistence_file.parent)
         
         # Load existing states
+        self.store = SessionStore(self.persistence_file)
         self._load_states()
         
+        # Writes are applied by a background thread so callers never wait on disk I/O
+        self._write_queue: "queue.Queue[Optional[StoreOp]]" = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer = threading.Thread(target=self._writer_loop, name="state-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+        
         logger.info(f"State Manager initialized with persistence at {self.persistence_file}")
     
     def _load_states(self):
-        """Load states from persistence file."""
+        """Load states from the store (migrating an older states.mpk / states.json if present)."""
         try:
-            if self.persistence_file.exists():
-                with open(self.persistence_file, 'r') as f:
-                    data = json.load(f)
-                    self.states = data
+            self.states = self.store.load_blobs()
+            if self.states:
                 logger.info(f"Loaded {len(self.states)} states from persistence")
-            else:
-                logger.info("No existing states found, starting fresh")
+                return
+            
+            for legacy_file in (self.persistence_file.with_suffix(".mpk"), self.persistence_file.with_suffix(".json")):
+                if legacy_file.exists():
+                    self._migrate(legacy_file)
+                    return
+            
+            logger.info("No existing states found, starting fresh")
         except Exception as e:
             logger.error(f"Error loading states: {e}")
             self.states = {}
     
-    def _save_states(self):
-        """Save states to persistence file."""
-        try:
-            with open(self.persistence_file, 'w') as f:
-                json.dump(self.states, f, indent=2, default=str)
-            logger.debug(f"Saved {len(self.states)} states to persistence")
-        except Exception as e:
-            logger.error(f"Error saving states: {e}")
+    def _migrate(self, legacy_file: Path):
+        """Import states from a legacy single-file store into the database."""
+        if legacy_file.suffix == ".mpk":
+            with open(legacy_file, 'rb') as f:
+                states = ormsgpack.unpackb(f.read())
+        else:
+            with open(legacy_file, 'rb') as f:
+                states = orjson.loads(f.read())
+        
+        self.store.apply(
+            ("put", session_id, pack_state(state), state.get("updated_at", ""))
+            for session_id, state in states.items()
+        )
+        self.states = {
+            session_id: AgentStateRecord.from_typed_dict(state)
+            for session_id, state in states.items()
+        }
+        logger.info(f"Migrated {len(self.states)} states from {legacy_file}")
+    
+    def _record(self, session_id: str) -> Optional[AgentStateRecord]:
+        """Get the record for a session, decoding it on first access."""
+        with self._lock:
+            record = self.states.get(session_id)
+            if isinstance(record, bytes):
+                record = AgentStateRecord.from_typed_dict(unpack_state(record))
+                self.states[session_id] = record
+            return record
+    
+    def _persist(self, session_id: str):
+        """Queue the current state of a session (or its deletion) for the writer."""
+        with self._lock:
+            record = self._record(session_id)
+            if record is None:
+                self._row_hashes.pop(session_id, None)
+                op: StoreOp = ("delete", session_id, None, None)
+            else:
+                blob = pack_state(record.to_typed_dict())
+                blob_hash = hash(blob)
+                if self._row_hashes.get(session_id) == blob_hash:
+                    logger.debug(f"State unchanged for session {session_id}, skipping write")
+                    return
+                self._row_hashes[session_id] = blob_hash
+                op = ("put", session_id, blob, record.updated_at)
+            # Enqueue under the lock so full-state writes of a session keep their order
+            self._write_queue.put(op)
+    
+    def _writer_loop(self):
+        """Drain queued writes, applying each burst in a single transaction."""
+        while True:
+            ops = [self._write_queue.get()]
+            
+            # Coalesce everything that queued up while the last write was in flight
+            while True:
+                try:
+                    ops.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = None in ops
+            batch = [op for op in ops if op is not None]
+            if batch:
+                try:
+                    self.store.apply(batch)
+                    logger.debug(f"Persisted {len(batch)} state writes")
+                except Exception as e:
+                    logger.error(f"Error saving states: {e}")
+            for _ in ops:
+                self._write_queue.task_done()
+            if stop:
+                return
+    
+    def flush(self):
+        """Block until every queued write has been applied."""
+        self._write_queue.join()
+    
+    def close(self):
+        """Flush pending writes, stop the background writer and close the store."""
+        if self._writer.is_alive():
+            self._write_queue.put(None)
+            self._writer.join()
+            self.store.close()
     
     def create_state(
         self,
@@ -340,14 +629,16 @@ class StateManager:
             Created state
         """
         state = create_initial_state(user_request, report_requirements, session_id)
-        self.states[session_id] = state
-        self._save_states()  # Persist immediately
+        with self._lock:
+            self.states[session_id] = AgentStateRecord.from_typed_dict(state)
+        self._persist(session_id)  # Persisted in the background
         logger.info(f"Created state for session: {session_id}")
         return state
     
     def get_state(self, session_id: str) -> Optional[AgentState]:
         """Get state by session ID."""
-        return self.states.get(session_id)
+        record = self._record(session_id)
+        return record.to_typed_dict() if record is not None else None
     
     def update_state(self, session_id: str, updates: Dict[str, Any]):
         """
@@ -357,18 +648,43 @@ class StateManager:
             session_id: Session identifier
             updates: Dictionary of updates to apply
         """
-        if session_id in self.states:
-            self.states[session_id].update(updates)
-            self.states[session_id]["updated_at"] = datetime.now().isoformat()
-            self._save_states()  # Persist immediately
-            logger.debug(f"Updated state for session: {session_id}")
+        with self._lock:
+            record = self._record(session_id)
+            # Re-asserting values the session already has (e.g. the same status) is not a write
+            if record is None or not record.update(updates):
+                return
+            record.updated_at = _now_iso()
+        self._persist(session_id)  # Only this session's row is rewritten
+        logger.debug(f"Updated state for session: {session_id}")
     
     def delete_state(self, session_id: str):
         """Delete state by session ID."""
-        if session_id in self.states:
+        with self._lock:
+            if session_id not in self.states:
+                return
             del self.states[session_id]
-            self._save_states()  # Persist immediately
-            logger.info(f"Deleted state for session: {session_id}")
+        self._persist(session_id)  # Persisted in the background
+        logger.info(f"Deleted state for session: {session_id}")
+    
+    def dump_pretty(self, session_id: str) -> Optional[str]:
+        """
+        Pretty-print a session state as indented JSON for debugging.
+        The store itself stays compact; indentation is only paid for on request.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            Indented JSON string, or None if the session does not exist
+        """
+        state = self.get_state(session_id)
+        if state is None:
+            return None
+        return orjson.dumps(
+            state,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
     
     def list_sessions(self) -> List[str]:
         """Get list of all session IDs."""
@@ -382,29 +698,32 @@ class StateManager:
             days: Number of days to keep sessions
         """
         from datetime import timedelta
-        cutoff = datetime.now() - timedelta(days=days)
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
         
-        to_delete = []
-        for session_id, state in self.states.items():
-            try:
-                updated_at = datetime.fromisoformat(state.get("updated_at", ""))
-                if updated_at < cutoff:
-                    to_delete.append(session_id)
-            except (ValueError, TypeError):
-                pass
+        # Make sure queued updates are in the database before filtering on updated_at
+        self.flush()
+        to_delete = self.store.delete_older_than(cutoff)
         
-        for session_id in to_delete:
-            self.delete_state(session_id)
+        with self._lock:
+            for session_id in to_delete:
+                self.states.pop(session_id, None)
+                self._row_hashes.pop(session_id, None)
         
         if to_delete:
             logger.info(f"Cleaned up {len(to_delete)} old sessions")
 
 
-# Global state manager instance
-_state_manager = StateManager()
+# Global state manager instance, created on first use so importing this module does no I/O
+_state_manager: Optional[StateManager] = None
+_state_manager_lock = threading.Lock()
 
 
 def get_state_manager() -> StateManager:
     """Get the global state manager instance."""
+    global _state_manager
+    if _state_manager is None:
+        with _state_manager_lock:
+            if _state_manager is None:
+                _state_manager = StateManager()
     return _state_manager
 
@@ -0,0 +1,76 @@
+"""
+Tests for the list reducers of the workflow state.
+"""
+
+import copy
+import operator
+
+import pytest
+
+from orchestration.state import MAX_STATE_ERRORS, append_list, bounded_errors
+
+UPDATES = [
+    [{"id": 1}],
+    [],
+    [{"id": 2}, {"id": 3}],
+    None,
+    [{"id": 4}],
+]
+
+
+def _fold(reducer, initial, updates):
+    value = initial
+    for update in updates:
+        value = reducer(value, update)
+    return value
+
+
+@pytest.mark.parametrize("initial", [None, [], [{"id": 0}]])
+def test_append_list_orders_like_operator_add(initial):
+    expected = _fold(operator.add, initial or [], [update or [] for update in UPDATES])
+    assert _fold(append_list, initial, UPDATES) == expected
+
+
+def test_append_list_does_not_mutate_inputs():
+    left = [{"id": 1}, {"id": 2}]
+    right = [{"id": 3}]
+    left_before, right_before = copy.deepcopy(left), copy.deepcopy(right)
+
+    merged = append_list(left, right)
+
+    assert merged == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert merged is not left
+    assert left == left_before
+    assert right == right_before
+
+
+def test_append_list_keeps_earlier_snapshots_intact():
+    # A checkpoint may hold a channel value by reference while later steps reduce into it
+    snapshots = []
+    value = None
+    for update in UPDATES:
+        value = append_list(value, update)
+        snapshots.append((value, list(value)))
+
+    for held, copied in snapshots:
+        assert held == copied
+
+
+def test_append_list_empty_update_reuses_list():
+    left = ["a"]
+    assert append_list(left, []) is left
+    assert append_list(left, None) is left
+    assert append_list(None, None) == []
+
+
+def test_bounded_errors_keeps_newest_without_mutating_inputs():
+    left = [{"agent": "a", "message": str(i)} for i in range(MAX_STATE_ERRORS)]
+    right = [{"agent": "b", "message": "new"}]
+    left_before = list(left)
+
+    merged = bounded_errors(left, right)
+
+    assert len(merged) == MAX_STATE_ERRORS
+    assert merged[-1] == right[0]
+    assert merged[0] == left[1]
+    assert left == left_before
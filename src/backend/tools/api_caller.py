@@ -3,19 +3,49 @@ API calling tool for making HTTP requests to external APIs.
 Handles authentication, retries, and response parsing.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import random
+from typing import Dict, Any, Optional, List, Tuple, Union
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 from enum import Enum
 import time
+import weakref
 
+import httpx
+import orjson
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
-import json
+
+from tools.http_utils import MAX_RESPONSE_BYTES, HostRateLimiter, ResponseTooLarge, aread_body, read_body
 
 logger = logging.getLogger(__name__)
 
 
+# Connection pool for the async client: enough sockets for large batches
+ASYNC_POOL_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=64)
+
+
+# (epoch second, ISO string) of the last formatted result timestamp
+_iso_cache = (0, "")
+
+
+def _iso_now() -> str:
+    """
+    Current local time as an ISO 8601 string with second resolution.
+    
+    Batches produce many results per second; they share one formatted string.
+    """
+    global _iso_cache
+    second = int(time.time())
+    cached_second, cached = _iso_cache
+    if second != cached_second:
+        cached = datetime.fromtimestamp(second).isoformat()
+        _iso_cache = (second, cached)
+    return cached
+
+
 class HTTPMethod(str, Enum):
     """HTTP request methods."""
     GET = "GET"
@@ -25,6 +55,19 @@ class HTTPMethod(str, Enum):
     PATCH = "PATCH"
 
 
+# Responses that signal a temporary condition worth retrying
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_TRANSIENT_ERRORS = frozenset({"Timeout", "Connection Error"})
+
+# Methods that are not retried unless the caller marks the call idempotent
+_NON_IDEMPOTENT_METHODS = frozenset({HTTPMethod.POST, HTTPMethod.PATCH})
+
+# Exponential backoff between attempts (seconds), and the longest Retry-After honored
+RETRY_BACKOFF_BASE = 2.0
+RETRY_BACKOFF_CAP = 10.0
+RETRY_AFTER_MAX = 60.0
+
+
 class APICallerTool:
     """
     Tool for making HTTP API calls to external services.
@@ -35,7 +78,10 @@ class APICallerTool:
         self,
         timeout: int = 30,
         max_retries: int = 3,
-        default_headers: Optional[Dict[str, str]] = None
+        default_headers: Optional[Dict[str, str]] = None,
+        max_concurrency: int = 8,
+        max_response_bytes: int = MAX_RESPONSE_BYTES,
+        host_rate_limit: Optional[float] = 120
     ):
         """
         Initialize API caller tool.
@@ -44,9 +90,24 @@ class APICallerTool:
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
             default_headers: Default headers for all requests
+            max_concurrency: Maximum API calls in flight during a batch
+            max_response_bytes: Largest response body read before the call fails
+            host_rate_limit: Async requests per minute to any one host without an
+                API_CONFIGS rate limit (None for no limit)
         """
         self.timeout = timeout
         self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.max_response_bytes = max_response_bytes
+        
+        # Paces async requests per host; hosts in API_CONFIGS use their configured rate
+        self._rate_limiter = HostRateLimiter(
+            host_rate_limit,
+            host_rates={
+                urlsplit(config["base_url"]).netloc: config["rate_limit"]
+                for config in API_CONFIGS.values()
+            }
+        )
         self.default_headers = default_headers or {
             'Content-Type': 'application/json',
             'Accept': 'application/json'
@@ -54,12 +115,46 @@ class APICallerTool:
         self.session = requests.Session()
         self.session.headers.update(self.default_headers)
         
+        # Async clients per event loop; concurrent sessions each run their own loop
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        
         logger.info("API Caller Tool initialized")
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
+    async def __aenter__(self) -> "APICallerTool":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Get the async HTTP client for the running event loop.
+        
+        One client (and its connection pool) is reused across calls on a loop,
+        and HTTP/2 servers multiplex concurrent requests over one connection.
+        Connections cannot move between event loops, so each loop gets its own
+        client; sessions sharing this tool on other loops are never affected.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                headers=self.default_headers,
+                timeout=self.timeout,
+                limits=ASYNC_POOL_LIMITS,
+                http2=True,
+                follow_redirects=True
+            )
+        return client
+    
+    async def aclose(self):
+        """Close the async HTTP client of the running event loop, if one was created."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
     def call_api(
         self,
         url: str,
@@ -70,11 +165,15 @@ class APICallerTool:
         json_body: Optional[Dict[str, Any]] = None,
         auth: Optional[tuple] = None,
         api_key: Optional[str] = None,
-        api_key_header: str = "X-API-Key"
+        api_key_header: str = "X-API-Key",
+        idempotent: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Make an API call.
         
+        Timeouts, connection errors, 429 and 5xx responses are retried up to
+        max_retries times, waiting for Retry-After when the server sends it.
+        
         Args:
             url: API endpoint URL
             method: HTTP method
@@ -85,61 +184,257 @@ class APICallerTool:
             auth: Basic auth tuple (username, password)
             api_key: API key for authentication
             api_key_header: Header name for API key
+            idempotent: Whether the call may be retried (defaults to False for POST/PATCH, True otherwise)
             
         Returns:
-            Dictionary with response data and metadata
+            Dictionary with response data and metadata (including the number of attempts)
         """
-        start_time = time.time()
+        request_headers = self._request_headers(headers, api_key, api_key_header, json_body is not None)
+        try:
+            payload = self._encode_json(json_body)
+        except orjson.JSONEncodeError as e:
+            return self._unsendable_result(url, e)
+        retryable = self._may_retry(method, idempotent)
         
-        # Prepare headers
-        request_headers = self.default_headers.copy()
-        if headers:
-            request_headers.update(headers)
+        logger.info(f"Calling API: {method.value} {url}")
         
-        # Add API key if provided
-        if api_key:
-            request_headers[api_key_header] = api_key
+        attempt = 1
+        while True:
+            result, retry_after = self._send(url, method, request_headers, params, data, payload, auth)
+            if not (retryable and attempt <= self.max_retries and self._is_transient(result)):
+                break
+            delay = self._retry_delay(attempt, retry_after)
+            logger.warning(f"Retrying {method.value} {url} in {delay:.1f}s after {result['error_type']} (attempt {attempt})")
+            time.sleep(delay)
+            attempt += 1
+        
+        result["attempts"] = attempt
+        return result
+    
+    def _send(
+        self,
+        url: str,
+        method: HTTPMethod,
+        request_headers: Dict[str, str],
+        params: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        payload: Optional[bytes],
+        auth: Optional[tuple]
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Make one request; returns the result and the response's Retry-After header."""
+        start_time = time.monotonic()
         
         try:
-            logger.info(f"Calling API: {method.value} {url}")
-            
-            # Make request
-            response = self.session.request(
+            # Make request (body streamed so oversized responses are cut off early)
+            with self.session.request(
                 method=method.value,
                 url=url,
                 headers=request_headers,
                 params=params,
-                data=data,
-                json=json_body,
+                data=payload if payload is not None else data,
                 auth=auth,
-                timeout=self.timeout
-            )
-            
-            # Calculate request time
-            request_time = time.time() - start_time
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                body = read_body(response, self.max_response_bytes)
             
-            # Handle response
-            if response.status_code >= 200 and response.status_code < 300:
-                return self._success_result(response, request_time)
-            else:
-                return self._error_result(
-                    url,
-                    f"HTTP {response.status_code}",
-                    response.text,
-                    response.status_code
-                )
+            result = self._handle_response(url, response, body, time.monotonic() - start_time)
+            return result, response.headers.get('Retry-After')
         
         except requests.exceptions.Timeout:
             logger.error(f"Timeout calling API: {url}")
-            return self._error_result(url, "Timeout", f"Request exceeded {self.timeout}s")
+            return self._error_result(url, "Timeout", f"Request exceeded {self.timeout}s"), None
+        
+        except ResponseTooLarge as e:
+            logger.error(str(e))
+            return self._error_result(url, "Response Too Large", str(e)), None
         
         except requests.exceptions.ConnectionError as e:
             logger.error(f"Connection error calling API: {url}: {e}")
-            return self._error_result(url, "Connection Error", str(e))
+            return self._error_result(url, "Connection Error", str(e)), None
         
         except Exception as e:
             logger.error(f"Error calling API {url}: {e}")
-            return self._error_result(url, "Error", str(e))
+            return self._error_result(url, "Error", str(e)), None
+    
+    async def acall_api(
+        self,
+        url: str,
+        method: HTTPMethod = HTTPMethod.GET,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+        auth: Optional[tuple] = None,
+        api_key: Optional[str] = None,
+        api_key_header: str = "X-API-Key",
+        idempotent: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of call_api() on a shared httpx.AsyncClient.
+        
+        Takes the same arguments, retries the same way and returns the same result dictionary.
+        """
+        request_headers = self._request_headers(headers, api_key, api_key_header, json_body is not None)
+        try:
+            payload = self._encode_json(json_body)
+        except orjson.JSONEncodeError as e:
+            return self._unsendable_result(url, e)
+        retryable = self._may_retry(method, idempotent)
+        
+        logger.info(f"Calling API: {method.value} {url}")
+        
+        attempt = 1
+        while True:
+            result, retry_after = await self._asend(url, method, request_headers, params, data, payload, auth)
+            if not (retryable and attempt <= self.max_retries and self._is_transient(result)):
+                break
+            delay = self._retry_delay(attempt, retry_after)
+            logger.warning(f"Retrying {method.value} {url} in {delay:.1f}s after {result['error_type']} (attempt {attempt})")
+            await asyncio.sleep(delay)
+            attempt += 1
+        
+        result["attempts"] = attempt
+        return result
+    
+    async def _asend(
+        self,
+        url: str,
+        method: HTTPMethod,
+        request_headers: Dict[str, str],
+        params: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        payload: Optional[bytes],
+        auth: Optional[tuple]
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Async variant of _send(), paced by the per-host rate limiter."""
+        await self._rate_limiter.acquire(url)
+        start_time = time.monotonic()
+        
+        try:
+            async with self._get_async_client().stream(
+                method.value,
+                url,
+                headers=request_headers,
+                params=params,
+                data=data if payload is None else None,
+                content=payload,
+                auth=auth
+            ) as response:
+                body = await aread_body(response, self.max_response_bytes)
+            
+            result = self._handle_response(url, response, body, time.monotonic() - start_time)
+            return result, response.headers.get('Retry-After')
+        
+        except httpx.TimeoutException:
+            logger.error(f"Timeout calling API: {url}")
+            return self._error_result(url, "Timeout", f"Request exceeded {self.timeout}s"), None
+        
+        except ResponseTooLarge as e:
+            logger.error(str(e))
+            return self._error_result(url, "Response Too Large", str(e)), None
+        
+        except httpx.TransportError as e:
+            logger.error(f"Connection error calling API: {url}: {e}")
+            return self._error_result(url, "Connection Error", str(e)), None
+        
+        except Exception as e:
+            logger.error(f"Error calling API {url}: {e}")
+            return self._error_result(url, "Error", str(e)), None
+    
+    @staticmethod
+    def _encode_json(json_body: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        """Serialize a JSON request body once, for every attempt (non-str keys become strings, like json.dumps)."""
+        if json_body is None:
+            return None
+        return orjson.dumps(json_body, option=orjson.OPT_NON_STR_KEYS)
+    
+    def _unsendable_result(self, url: str, error: Exception) -> Dict[str, Any]:
+        """Error result for a request whose body could not be serialized (nothing was sent)."""
+        logger.error(f"Error calling API {url}: {error}")
+        result = self._error_result(url, "Error", str(error))
+        result["attempts"] = 0
+        return result
+    
+    @staticmethod
+    def _may_retry(method: HTTPMethod, idempotent: Optional[bool]) -> bool:
+        """Whether a failed call may be sent again (POST/PATCH only when marked idempotent)."""
+        if idempotent is not None:
+            return idempotent
+        return method not in _NON_IDEMPOTENT_METHODS
+    
+    @staticmethod
+    def _is_transient(result: Dict[str, Any]) -> bool:
+        """Whether a failed call is worth retrying; other 4xx errors will not change."""
+        if result["status"] != "error":
+            return False
+        return result["status_code"] in RETRYABLE_STATUS_CODES or result["error_type"] in _TRANSIENT_ERRORS
+    
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+        """
+        Seconds to wait before the next attempt.
+        
+        Honors a Retry-After header (seconds or HTTP date, capped at
+        RETRY_AFTER_MAX); otherwise uses jittered exponential backoff.
+        """
+        if retry_after:
+            if retry_after.isdigit():
+                return min(float(retry_after), RETRY_AFTER_MAX)
+            try:
+                wait = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                return min(max(wait, 0.0), RETRY_AFTER_MAX)
+            except (TypeError, ValueError):
+                pass
+        return min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2 ** (attempt - 1)) * (0.5 + random.random())
+    
+    def _request_headers(
+        self,
+        headers: Optional[Dict[str, str]],
+        api_key: Optional[str],
+        api_key_header: str,
+        sends_json: bool
+    ) -> Optional[Dict[str, str]]:
+        """
+        Per-call headers to send on top of the defaults.
+        
+        The session and async client already carry default_headers and merge
+        these into them, so only the extras are built (no copy of the defaults,
+        and no new dict at all for a plain call). The caller's dict is never mutated.
+        """
+        extra = headers
+        
+        # Add API key if provided
+        if api_key:
+            extra = {**extra, api_key_header: api_key} if extra else {api_key_header: api_key}
+        
+        # JSON bodies are sent as raw bytes, so mark them unless a Content-Type is already set
+        if sends_json and 'Content-Type' not in self.default_headers and not (extra and 'Content-Type' in extra):
+            extra = {**extra, 'Content-Type': 'application/json'} if extra else {'Content-Type': 'application/json'}
+        
+        return extra
+    
+    def _handle_response(
+        self,
+        url: str,
+        response: Union[requests.Response, httpx.Response],
+        body: bytes,
+        request_time: float
+    ) -> Dict[str, Any]:
+        """Turn an HTTP response (requests or httpx) and its body into a result dictionary."""
+        if response.status_code >= 200 and response.status_code < 300:
+            return self._success_result(response, body, request_time)
+        return self._error_result(
+            url,
+            f"HTTP {response.status_code}",
+            self._decode_text(response, body),
+            response.status_code
+        )
+    
+    @staticmethod
+    def _decode_text(response: Union[requests.Response, httpx.Response], body: bytes) -> str:
+        """Decode a body as text using the response's declared charset."""
+        return body.decode(response.encoding or 'utf-8', errors='replace')
     
     def call_rest_api(
         self,
@@ -165,7 +460,8 @@ class APICallerTool:
     
     def _success_result(
         self,
-        response: requests.Response,
+        response: Union[requests.Response, httpx.Response],
+        body: bytes,
         request_time: float
     ) -> Dict[str, Any]:
         """
@@ -173,6 +469,7 @@ class APICallerTool:
         
         Args:
             response: HTTP response object
+            body: Response body
             request_time: Time taken for request
             
         Returns:
@@ -180,18 +477,18 @@ class APICallerTool:
         """
         # Try to parse JSON response
         try:
-            response_data = response.json()
-        except json.JSONDecodeError:
-            response_data = response.text
+            response_data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            response_data = self._decode_text(response, body)
         
         return {
             "status": "success",
             "status_code": response.status_code,
             "data": response_data,
             "headers": dict(response.headers),
-            "url": response.url,
+            "url": str(response.url),
             "request_time": round(request_time, 2),
-            "retrieved_at": datetime.now().isoformat()
+            "retrieved_at": _iso_now()
         }
     
     def _error_result(
@@ -219,40 +516,66 @@ class APICallerTool:
             "error_type": error_type,
             "error_message": error_message,
             "url": url,
-            "retrieved_at": datetime.now().isoformat()
+            "retrieved_at": _iso_now()
         }
     
     def batch_api_calls(
         self,
-        requests: List[Dict[str, Any]],
-        delay_between_calls: float = 0.5
+        requests: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """
-        Make multiple API calls with delay between them.
+        Make multiple API calls concurrently from synchronous code.
+        
+        Runs abatch_api_calls() on a private event loop, so it must not be
+        called from a running loop (await abatch_api_calls() there instead).
         
         Args:
             requests: List of request specifications (each a dict with call_api args)
-            delay_between_calls: Delay in seconds between calls
             
         Returns:
-            List of API response dictionaries
+            List of API response dictionaries, in request order
         """
-        results = []
+        return asyncio.run(self._closing(self.abatch_api_calls(requests)))
+    
+    async def abatch_api_calls(
+        self,
+        requests: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Make multiple API calls concurrently, at most max_concurrency at a time.
+        
+        Args:
+            requests: List of request specifications (each a dict with call_api args)
+            
+        Returns:
+            List of API response dictionaries, in request order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def call_one(req_spec: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.acall_api(**req_spec)
         
         logger.info(f"Making {len(requests)} API calls")
         
-        for i, req_spec in enumerate(requests):
-            result = self.call_api(**req_spec)
-            results.append(result)
-            
-            # Add delay between requests (except for last one)
-            if i < len(requests) - 1:
-                time.sleep(delay_between_calls)
+        outcomes = await asyncio.gather(*(call_one(req_spec) for req_spec in requests), return_exceptions=True)
+        results = [
+            self._error_result(req_spec.get("url", ""), "Error", str(outcome))
+            if isinstance(outcome, BaseException) else outcome
+            for req_spec, outcome in zip(requests, outcomes)
+        ]
         
         successful = len([r for r in results if r["status"] == "success"])
         logger.info(f"Completed {successful}/{len(requests)} API calls successfully")
         
         return results
+    
+    async def _closing(self, coro):
+        """Await a coroutine, then close the async client of the running loop (and only that one)."""
+        try:
+            return await coro
+        finally:
+            await self.aclose()
 
 
 # Predefined API configurations
@@ -2,8 +2,12 @@
 Gemini API wrapper with support for structured outputs, tool calling, and streaming.
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Type
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type
 from pydantic import BaseModel
 
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -15,6 +19,54 @@ from config import settings
 logger = logging.getLogger(__name__)
 
 
+def _new_chat(model: str, temperature: float, max_tokens: int) -> ChatGoogleGenerativeAI:
+    """Create a chat client for one configuration."""
+    logger.info(f"Creating Gemini client: {model} (temperature={temperature}, max_tokens={max_tokens})")
+    return ChatGoogleGenerativeAI(
+        model=model,
+        google_api_key=settings.gemini_api_key,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+
+
+@lru_cache(maxsize=32)
+def _get_chat(model: str, temperature: float, max_tokens: int) -> ChatGoogleGenerativeAI:
+    """
+    Shared chat client per configuration, for use outside an event loop.
+    
+    Wrappers with the same model, temperature and token limit reuse one
+    client (and its gRPC channel) instead of opening their own.
+    """
+    return _new_chat(model, temperature, max_tokens)
+
+
+# Chat clients used inside an event loop, per loop: their async transport binds to the
+# first loop that uses it, and every workflow run drives its own loop (asyncio.run)
+_loop_chats: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, float, int], ChatGoogleGenerativeAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+_loop_chats_lock = threading.Lock()
+
+
+def _get_loop_chat(
+    loop: asyncio.AbstractEventLoop,
+    model: str,
+    temperature: float,
+    max_tokens: int
+) -> ChatGoogleGenerativeAI:
+    """Chat client per configuration for one event loop, dropped with the loop."""
+    key = (model, temperature, max_tokens)
+    with _loop_chats_lock:
+        chats = _loop_chats.get(loop)
+        if chats is None:
+            chats = _loop_chats[loop] = {}
+        chat = chats.get(key)
+        if chat is None:
+            chat = chats[key] = _new_chat(model, temperature, max_tokens)
+    return chat
+
+
 class GeminiLLM:
     """
     Wrapper for Google Gemini API with enhanced features.
@@ -39,15 +91,22 @@ class GeminiLLM:
         self.temperature = temperature
         self.max_tokens = max_tokens or 65536
         
-        self.llm = ChatGoogleGenerativeAI(
-            model=self.model_name,
-            google_api_key=settings.gemini_api_key,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-        )
-        
         logger.info(f"Gemini LLM initialized: {self.model_name}")
     
+    @property
+    def llm(self) -> ChatGoogleGenerativeAI:
+        """
+        Underlying chat client, created on first use and shared by matching wrappers.
+        
+        Inside a running event loop this is that loop's own client, so async
+        calls never use a transport bound to another (possibly closed) loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return _get_chat(self.model_name, self.temperature, self.max_tokens)
+        return _get_loop_chat(loop, self.model_name, self.temperature, self.max_tokens)
+    
     def invoke(
         self,
         messages: List[BaseMessage],
@@ -70,6 +129,53 @@ class GeminiLLM:
             logger.error(f"Error invoking Gemini: {e}")
             raise
     
+    async def ainvoke(
+        self,
+        messages: List[BaseMessage],
+        **kwargs
+    ) -> str:
+        """
+        Async variant of invoke().
+        
+        Args:
+            messages: List of messages
+            **kwargs: Additional arguments
+            
+        Returns:
+            Response content as string
+        """
+        try:
+            response = await self.llm.ainvoke(messages, **kwargs)
+            return response.content if hasattr(response, 'content') else str(response)
+        except Exception as e:
+            logger.error(f"Error invoking Gemini: {e}")
+            raise
+    
+    async def ainvoke_many(
+        self,
+        message_lists: List[List[BaseMessage]],
+        max_concurrency: int = 8,
+        **kwargs
+    ) -> List[str]:
+        """
+        Invoke the LLM for several independent prompts concurrently.
+        
+        Args:
+            message_lists: One list of messages per prompt
+            max_concurrency: Maximum requests in flight (keeps bursts under the API rate limit)
+            **kwargs: Additional arguments passed to each call
+            
+        Returns:
+            Response contents, in prompt order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def invoke_one(messages: List[BaseMessage]) -> str:
+            async with semaphore:
+                return await self.ainvoke(messages, **kwargs)
+        
+        return list(await asyncio.gather(*(invoke_one(messages) for messages in message_lists)))
+    
     def invoke_with_system(
         self,
         system_prompt: str,
@@ -152,6 +258,77 @@ class GeminiLLM:
         except Exception as e:
             logger.error(f"Error streaming from Gemini: {e}")
             raise
+    
+    async def astream_to_buffer(
+        self,
+        messages: List[BaseMessage],
+        buf: bytearray,
+        **kwargs
+    ) -> int:
+        """
+        Stream a response into a caller-owned buffer as UTF-8 bytes.
+        
+        Avoids keeping a list of chunk strings around to join at the end.
+        
+        Args:
+            messages: List of messages
+            buf: Buffer the response is appended to
+            **kwargs: Additional arguments
+            
+        Returns:
+            Number of bytes appended
+        """
+        start = len(buf)
+        async for text in self.astream(messages, **kwargs):
+            buf += text.encode('utf-8')
+        return len(buf) - start
+    
+    async def astream_iter(
+        self,
+        messages: List[BaseMessage],
+        queue_maxsize: int = 64,
+        **kwargs
+    ):
+        """
+        Stream response chunks through a bounded queue.
+        
+        The network side runs as a separate task that keeps receiving while the
+        consumer processes earlier chunks; once queue_maxsize chunks are waiting
+        it pauses, so a slow consumer applies backpressure instead of the whole
+        response piling up in memory.
+        
+        Args:
+            messages: List of messages
+            queue_maxsize: Maximum chunks buffered ahead of the consumer
+            **kwargs: Additional arguments
+            
+        Yields:
+            Response chunks
+        """
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=queue_maxsize)
+        done = object()
+        
+        async def receive():
+            try:
+                async for text in self.astream(messages, **kwargs):
+                    await chunks.put(text)
+                await chunks.put(done)
+            except Exception as e:
+                # Re-raised on the consumer side
+                await chunks.put(e)
+        
+        receiver = asyncio.create_task(receive())
+        try:
+            while True:
+                item = await chunks.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not receiver.done():
+                receiver.cancel()
 
 
 class StructuredGeminiLLM:
@@ -221,6 +398,8 @@ class ToolCallingGeminiLLM:
         """
         self.llm = llm
         self.tools = {tool.name: tool for tool in tools}
+        # Bound async entry points, resolved once instead of per tool call
+        self._async_dispatch = {tool.name: tool.ainvoke for tool in tools}
         self.model_name = model_name
         logger.info(f"Tool-calling Gemini LLM initialized with {len(tools)} tools")
     
@@ -300,6 +479,49 @@ class ToolCallingGeminiLLM:
                 })
         
         return results
+    
+    async def aexecute_tool_calls(
+        self,
+        tool_calls: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute independent tool calls concurrently.
+        
+        Args:
+            tool_calls: List of tool call specifications
+            
+        Returns:
+            List of tool results, in call order
+        """
+        return list(await asyncio.gather(*(self._arun_tool_call(tool_call) for tool_call in tool_calls)))
+    
+    async def _arun_tool_call(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one tool call, turning failures into an error result."""
+        tool_name = tool_call.get("name")
+        run = self._async_dispatch.get(tool_name)
+        
+        if run is None:
+            logger.warning(f"Unknown tool requested: {tool_name}")
+            return {
+                "tool": tool_name,
+                "error": f"Unknown tool: {tool_name}",
+                "status": "error"
+            }
+        
+        try:
+            result = await run(tool_call.get("args", {}))
+            return {
+                "tool": tool_name,
+                "result": result,
+                "status": "success"
+            }
+        except Exception as e:
+            logger.error(f"Error executing tool {tool_name}: {e}")
+            return {
+                "tool": tool_name,
+                "error": str(e),
+                "status": "error"
+            }
 
 
 def create_gemini_llm(
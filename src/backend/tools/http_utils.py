@@ -0,0 +1,124 @@
+"""
+Helpers shared by the HTTP tools: size-capped body reads and per-host rate limiting.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+# Default cap on a single response body
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+
+# Read size for streamed bodies
+CHUNK_SIZE = 64 * 1024
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response body exceeds the configured size cap."""
+    
+    def __init__(self, url: str, max_bytes: int):
+        super().__init__(f"Response from {url} exceeds {max_bytes} bytes")
+        self.url = url
+        self.max_bytes = max_bytes
+
+
+def _check_declared_length(response: Union[requests.Response, httpx.Response], max_bytes: int):
+    """Fail before reading anything if Content-Length already exceeds the cap."""
+    declared = response.headers.get('Content-Length')
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise ResponseTooLarge(str(response.url), max_bytes)
+
+
+def read_body(response: requests.Response, max_bytes: int = MAX_RESPONSE_BYTES) -> bytes:
+    """
+    Read a streamed requests response (stream=True) with a size cap.
+    
+    Args:
+        response: Response whose body has not been consumed yet
+        max_bytes: Maximum body size
+    
+    Returns:
+        The response body
+    
+    Raises:
+        ResponseTooLarge: If the body is larger than max_bytes
+    """
+    _check_declared_length(response, max_bytes)
+    body = bytearray()
+    for chunk in response.iter_content(CHUNK_SIZE):
+        body += chunk
+        if len(body) > max_bytes:
+            raise ResponseTooLarge(response.url, max_bytes)
+    return bytes(body)
+
+
+async def aread_body(response: httpx.Response, max_bytes: int = MAX_RESPONSE_BYTES) -> bytes:
+    """
+    Read a streamed httpx response (client.stream()) with a size cap.
+    
+    Args:
+        response: Response whose body has not been consumed yet
+        max_bytes: Maximum body size
+    
+    Returns:
+        The response body
+    
+    Raises:
+        ResponseTooLarge: If the body is larger than max_bytes
+    """
+    _check_declared_length(response, max_bytes)
+    body = bytearray()
+    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+        body += chunk
+        if len(body) > max_bytes:
+            raise ResponseTooLarge(str(response.url), max_bytes)
+    return bytes(body)
+
+
+class HostRateLimiter:
+    """
+    Per-host token bucket for async requests.
+    
+    Each host gets its own bucket, so requests to different hosts never wait
+    on each other. Callers that find the bucket empty reserve a future token
+    and sleep until it is due, which keeps same-host pacing accurate under
+    concurrency without polling.
+    """
+    
+    def __init__(
+        self,
+        default_rate: Optional[float],
+        host_rates: Optional[Dict[str, float]] = None,
+        burst: float = 1.0
+    ):
+        """
+        Args:
+            default_rate: Requests per minute for hosts without their own rate (None = unlimited)
+            host_rates: Requests per minute for specific hosts
+            burst: Requests a host may make back to back before pacing starts
+        """
+        self.default_rate = default_rate
+        self.host_rates = host_rates or {}
+        self.burst = burst
+        # host -> (tokens, time.monotonic() of last update); tokens go negative for reservations
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+    
+    async def acquire(self, url: str):
+        """Wait until a request to the URL's host is allowed."""
+        host = urlsplit(url).netloc.lower()
+        rate = self.host_rates.get(host, self.default_rate)
+        if not rate:
+            return
+        
+        per_second = rate / 60.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(host, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * per_second) - 1.0
+        self._buckets[host] = (tokens, now)
+        
+        if tokens < 0:
+            await asyncio.sleep(-tokens / per_second)
@@ -3,18 +3,194 @@ Web scraping tool for extracting content from predefined URLs.
 Handles errors gracefully and tracks sources for citations.
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlencode, urlparse, urlsplit, urlunsplit
 import time
+import weakref
 
+import httpx
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from tools.http_utils import MAX_RESPONSE_BYTES, HostRateLimiter, ResponseTooLarge, aread_body, read_body
+
 logger = logging.getLogger(__name__)
 
+# Elements dropped before extracting text (navigation and page chrome, not content)
+_STRIPPED_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside')
+
+# Elements whose text makes up the extracted content, and those rendered as headings
+_CONTENT_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'li')
+_HEADING_TAGS = frozenset(('h1', 'h2', 'h3'))
+
+
+# Pool sizing for the async client; idle keep-alive connections are reused across batches
+ASYNC_POOL_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=64, keepalive_expiry=75)
+
+
+# Scraped pages remembered for conditional re-fetches (oldest are evicted)
+PAGE_CACHE_SIZE = 128
+
+# Pages at least this large are parsed in a worker process; smaller ones are not worth the hand-off
+PROCESS_PARSE_MIN_BYTES = 256 * 1024
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+# (epoch second, ISO string) of the last formatted retrieval timestamp
+_iso_cache = (0, "")
+
+
+def _iso_now() -> str:
+    """Current local time as an ISO 8601 string, re-formatted at most once per second."""
+    global _iso_cache
+    second = int(time.time())
+    cached_second, cached = _iso_cache
+    if second != cached_second:
+        cached = datetime.fromtimestamp(second).isoformat()
+        _iso_cache = (second, cached)
+    return cached
+
+
+def _normalize_url(url: str) -> str:
+    """Canonical form of a URL for de-duplication (case-folded host, sorted query, no fragment)."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+
+# Containers searched for the main content, in order of preference
+_MAIN_CONTENT_TAGS = ('main', 'article', 'body')
+
+
+def _find_main_content(tree: lxml.html.HtmlElement) -> Optional[lxml.html.HtmlElement]:
+    """
+    First <main>, else first <article>, else <body>, found in a single walk of the tree.
+    """
+    found: Dict[str, lxml.html.HtmlElement] = {}
+    for elem in tree.iter(*_MAIN_CONTENT_TAGS):
+        if elem.tag == 'main':
+            return elem
+        found.setdefault(elem.tag, elem)
+    return found.get('article', found.get('body'))
+
+
+def _extract_content(
+    tree: lxml.html.HtmlElement,
+    text_only: bool = True
+) -> str:
+    """
+    Extract content from a parsed HTML document.
+    
+    Args:
+        tree: lxml document root
+        text_only: If True, extract only text
+        
+    Returns:
+        Extracted content as string
+    """
+    # Remove script and style elements (keeping the text that follows them)
+    etree.strip_elements(tree, *_STRIPPED_TAGS, with_tail=False)
+    
+    if text_only:
+        # Extract text from main content areas
+        main_content = _find_main_content(tree)
+        
+        if main_content is not None:
+            # Get text with some structure
+            content_parts = []
+            
+            for elem in main_content.iter(*_CONTENT_TAGS):
+                text = elem.text_content().strip()
+                if text:
+                    # Add heading markers
+                    if elem.tag in _HEADING_TAGS:
+                        content_parts.append(f"\n## {text}\n")
+                    else:
+                        content_parts.append(text)
+            
+            return '\n'.join(content_parts)
+        else:
+            return '\n'.join(
+                text.strip() for text in tree.itertext() if text.strip()
+            )
+    else:
+        return lxml.html.tostring(tree, encoding='unicode')
+
+
+def _declared_charset(headers: Any) -> Optional[str]:
+    """The charset parameter of a response's Content-Type header, if any."""
+    content_type = headers.get('Content-Type', '')
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
+
+
+@lru_cache(maxsize=16)
+def _html_parser(encoding: Optional[str]) -> lxml.html.HTMLParser:
+    """lxml HTML parser for a declared charset (reused; None lets lxml detect it)."""
+    try:
+        return lxml.html.HTMLParser(encoding=encoding)
+    except LookupError:
+        logger.debug(f"Unknown charset {encoding!r}, detecting instead")
+        return lxml.html.HTMLParser()
+
+
+def _parse_page(html: bytes, text_only: bool, encoding: Optional[str] = None) -> Tuple[Optional[str], str]:
+    """
+    Parse a page into its title (None if missing) and extracted content.
+    
+    Module-level and returning plain strings so it can run in a worker process.
+    A charset declared by the server is passed straight to the parser.
+    """
+    # Parse HTML (lxml's C parser)
+    tree = lxml.html.document_fromstring(html, parser=_html_parser(encoding))
+    
+    # Extract metadata
+    title = tree.find('.//title')
+    title_text = title.text_content().strip() if title is not None else None
+    
+    return title_text, _extract_content(tree, text_only)
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for parsing large pages, created on first use and shared by all scrapers.
+    
+    Workers are started from a forkserver (spawn where that is unavailable):
+    forking the threaded server process directly risks deadlocked children.
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context(method)
+            )
+        return _parse_pool
+
+
+def shutdown_parse_pool():
+    """Stop the parse worker processes, if they were started (e.g. on app shutdown)."""
+    global _parse_pool
+    with _parse_pool_lock:
+        pool, _parse_pool = _parse_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
 
 class WebScraperTool:
     """
@@ -29,7 +205,10 @@ class WebScraperTool:
     def __init__(
         self,
         timeout: int = 30,
-        max_retries: int = 3
+        max_retries: int = 3,
+        max_concurrency: int = 5,
+        max_page_bytes: int = MAX_RESPONSE_BYTES,
+        host_rate_limit: Optional[float] = 60
     ):
         """
         Initialize web scraper tool.
@@ -37,14 +216,64 @@ class WebScraperTool:
         Args:
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
+            max_concurrency: Maximum pages fetched at once during a batch
+            max_page_bytes: Largest page downloaded before the scrape fails
+            host_rate_limit: Async requests per minute to any one site (None for no limit)
         """
         self.timeout = timeout
         self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.max_page_bytes = max_page_bytes
+        
+        # Politeness: pages from the same site are paced, different sites are fetched freely
+        self._rate_limiter = HostRateLimiter(host_rate_limit)
+        
+        # (normalized URL, text only) -> (ETag, Last-Modified, result) for conditional GETs
+        self._page_cache: Dict[Tuple[str, bool], Tuple[Optional[str], Optional[str], Dict[str, Any]]] = {}
+        
         self.session = requests.Session()
         self.session.headers.update(self.DEFAULT_HEADERS)
         
+        # Async clients per event loop; concurrent sessions each run their own loop
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        
         logger.info("Web Scraper Tool initialized")
     
+    async def __aenter__(self) -> "WebScraperTool":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Get the async HTTP client for the running event loop.
+        
+        One client (and its connection pool) is reused across calls on a loop,
+        and HTTP/2 servers multiplex concurrent requests over one connection.
+        Connections cannot move between event loops, so each loop gets its own
+        client; sessions sharing this tool on other loops are never affected.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                headers=self.DEFAULT_HEADERS,
+                timeout=self.timeout,
+                limits=ASYNC_POOL_LIMITS,
+                http2=True,
+                follow_redirects=True
+            )
+        return client
+    
+    async def aclose(self):
+        """Close the async HTTP client of the running event loop, if one was created."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10)
@@ -64,45 +293,90 @@ class WebScraperTool:
         Returns:
             Dictionary with scraped content and metadata
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         
         try:
             logger.info(f"Scraping URL: {url}")
             
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            cache_key = (_normalize_url(url), extract_text_only)
+            with self.session.get(
+                url,
+                headers=self._conditional_headers(cache_key),
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                if response.status_code == 304:
+                    return self._cached_result(cache_key)
+                response.raise_for_status()
+                html = read_body(response, self.max_page_bytes)
             
-            # Extract metadata
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else urlparse(url).netloc
-            
-            # Extract main content
-            content = self._extract_content(soup, extract_text_only)
+            parsed = _parse_page(html, extract_text_only, _declared_charset(response.headers))
+            result = self._page_result(url, parsed, start_time)
+            self._remember_page(cache_key, response.headers, result)
+            return result
             
-            # Calculate scraping time
-            scrape_time = time.time() - start_time
+        except requests.exceptions.Timeout:
+            logger.error(f"Timeout scraping {url}")
+            return self._error_result(url, "Timeout")
+        
+        except ResponseTooLarge as e:
+            logger.error(str(e))
+            return self._error_result(url, "Response too large")
+        
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"HTTP error scraping {url}: {e}")
+            return self._error_result(url, f"HTTP Error: {e.response.status_code}")
+        
+        except Exception as e:
+            logger.error(f"Error scraping {url}: {e}")
+            return self._error_result(url, str(e))
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10)
+    )
+    async def ascrape_url(
+        self,
+        url: str,
+        extract_text_only: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Async variant of scrape_url() on a shared httpx.AsyncClient.
+        
+        Takes the same arguments and returns the same result dictionary.
+        Requests to the same site are paced by the per-host rate limiter.
+        """
+        await self._rate_limiter.acquire(url)
+        start_time = time.monotonic()
+        
+        try:
+            logger.info(f"Scraping URL: {url}")
             
-            result = {
-                "url": url,
-                "title": title_text,
-                "content": content,
-                "retrieved_at": datetime.now().isoformat(),
-                "scrape_time": round(scrape_time, 2),
-                "status": "success",
-                "content_length": len(content)
-            }
+            cache_key = (_normalize_url(url), extract_text_only)
+            async with self._get_async_client().stream(
+                'GET',
+                url,
+                headers=self._conditional_headers(cache_key)
+            ) as response:
+                if response.status_code == 304:
+                    return self._cached_result(cache_key)
+                response.raise_for_status()
+                html = await aread_body(response, self.max_page_bytes)
             
-            logger.info(f"Successfully scraped {url} ({len(content)} chars in {scrape_time:.2f}s)")
+            parsed = await self._aparse_page(html, extract_text_only, _declared_charset(response.headers))
+            result = self._page_result(url, parsed, start_time)
+            self._remember_page(cache_key, response.headers, result)
             return result
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"Timeout scraping {url}")
             return self._error_result(url, "Timeout")
         
-        except requests.exceptions.HTTPError as e:
+        except ResponseTooLarge as e:
+            logger.error(str(e))
+            return self._error_result(url, "Response too large")
+        
+        except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error scraping {url}: {e}")
             return self._error_result(url, f"HTTP Error: {e.response.status_code}")
         
@@ -110,80 +384,150 @@ class WebScraperTool:
             logger.error(f"Error scraping {url}: {e}")
             return self._error_result(url, str(e))
     
-    def scrape_multiple_urls(
+    def _conditional_headers(self, cache_key: Tuple[str, bool]) -> Optional[Dict[str, str]]:
+        """Validators for re-fetching a cached page, so an unchanged page answers 304 without a body."""
+        cached = self._page_cache.get(cache_key)
+        if cached is None:
+            return None
+        etag, last_modified, _ = cached
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+    
+    def _cached_result(self, cache_key: Tuple[str, bool]) -> Dict[str, Any]:
+        """Serve a page the server reported as not modified from the cache."""
+        result = dict(self._page_cache[cache_key][2])
+        result["retrieved_at"] = _iso_now()
+        result["scrape_time"] = 0.0
+        logger.info(f"Not modified, using cached content for {result['url']}")
+        return result
+    
+    def _remember_page(self, cache_key: Tuple[str, bool], headers: Any, result: Dict[str, Any]):
+        """Cache a scraped page if the server sent validators to re-check it with."""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not (etag or last_modified):
+            return
+        self._page_cache.pop(cache_key, None)
+        if len(self._page_cache) >= PAGE_CACHE_SIZE:
+            self._page_cache.pop(next(iter(self._page_cache)))
+        self._page_cache[cache_key] = (etag, last_modified, result)
+    
+    async def _aparse_page(
         self,
-        urls: List[str],
-        delay_between_requests: float = 1.0
-    ) -> List[Dict[str, Any]]:
+        html: bytes,
+        extract_text_only: bool,
+        encoding: Optional[str]
+    ) -> Tuple[Optional[str], str]:
+        """Parse a page for an async scrape; large pages go to the worker process pool."""
+        if len(html) < PROCESS_PARSE_MIN_BYTES:
+            return _parse_page(html, extract_text_only, encoding)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_parse_pool(), _parse_page, html, extract_text_only, encoding)
+    
+    def _page_result(
+        self,
+        url: str,
+        parsed: Tuple[Optional[str], str],
+        start_time: float
+    ) -> Dict[str, Any]:
         """
-        Scrape multiple URLs with delay between requests.
+        Build the scraping result for a parsed page.
         
         Args:
-            urls: List of URLs to scrape
-            delay_between_requests: Delay in seconds between requests
+            url: URL the page was fetched from
+            parsed: (title, content) from _parse_page()
+            start_time: time.monotonic() when the request started
             
         Returns:
-            List of scraping results
+            Success result dictionary
         """
-        results = []
-        
-        logger.info(f"Scraping {len(urls)} URLs")
+        title_text, content = parsed
+        if title_text is None:
+            title_text = urlparse(url).netloc
         
-        for i, url in enumerate(urls):
-            result = self.scrape_url(url)
-            results.append(result)
-            
-            # Add delay between requests (except for last one)
-            if i < len(urls) - 1:
-                time.sleep(delay_between_requests)
+        # Calculate scraping time
+        scrape_time = time.monotonic() - start_time
         
-        successful = len([r for r in results if r["status"] == "success"])
-        logger.info(f"Scraped {successful}/{len(urls)} URLs successfully")
+        result = {
+            "url": url,
+            "title": title_text,
+            "content": content,
+            "retrieved_at": _iso_now(),
+            "scrape_time": round(scrape_time, 2),
+            "status": "success",
+            "content_length": len(content)
+        }
         
-        return results
+        logger.info(f"Successfully scraped {url} ({len(content)} chars in {scrape_time:.2f}s)")
+        return result
     
-    def _extract_content(
+    def scrape_multiple_urls(
         self,
-        soup: BeautifulSoup,
-        text_only: bool = True
-    ) -> str:
+        urls: List[str]
+    ) -> List[Dict[str, Any]]:
         """
-        Extract content from BeautifulSoup object.
+        Scrape multiple URLs concurrently from synchronous code.
+        
+        Runs ascrape_multiple_urls() on a private event loop, so it must not be
+        called from a running loop (await ascrape_multiple_urls() there instead).
         
         Args:
-            soup: BeautifulSoup parsed HTML
-            text_only: If True, extract only text
+            urls: List of URLs to scrape
             
         Returns:
-            Extracted content as string
+            List of scraping results, one per distinct URL, in URL order
         """
-        # Remove script and style elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-            element.decompose()
+        return asyncio.run(self._closing(self.ascrape_multiple_urls(urls)))
+    
+    async def ascrape_multiple_urls(
+        self,
+        urls: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Scrape multiple URLs concurrently, at most max_concurrency at a time.
+        
+        URLs that differ only in host case, query order or fragment are fetched once.
         
-        if text_only:
-            # Extract text from main content areas
-            main_content = soup.find('main') or soup.find('article') or soup.find('body')
+        Args:
+            urls: List of URLs to scrape
             
-            if main_content:
-                # Get text with some structure
-                paragraphs = main_content.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'li'])
-                content_parts = []
-                
-                for elem in paragraphs:
-                    text = elem.get_text().strip()
-                    if text:
-                        # Add heading markers
-                        if elem.name in ['h1', 'h2', 'h3']:
-                            content_parts.append(f"\n## {text}\n")
-                        else:
-                            content_parts.append(text)
-                
-                return '\n'.join(content_parts)
-            else:
-                return soup.get_text(separator='\n', strip=True)
-        else:
-            return str(soup)
+        Returns:
+            List of scraping results, one per distinct URL, in URL order
+        """
+        distinct: Dict[str, str] = {}
+        for url in urls:
+            distinct.setdefault(_normalize_url(url), url)
+        urls = list(distinct.values())
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def scrape_one(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.ascrape_url(url)
+        
+        logger.info(f"Scraping {len(urls)} URLs")
+        
+        outcomes = await asyncio.gather(*(scrape_one(url) for url in urls), return_exceptions=True)
+        results = [
+            self._error_result(url, str(outcome)) if isinstance(outcome, BaseException) else outcome
+            for url, outcome in zip(urls, outcomes)
+        ]
+        
+        successful = len([r for r in results if r["status"] == "success"])
+        logger.info(f"Scraped {successful}/{len(urls)} URLs successfully")
+        
+        return results
+    
+    async def _closing(self, coro):
+        """Await a coroutine, then close the async client of the running loop (and only that one)."""
+        try:
+            return await coro
+        finally:
+            await self.aclose()
     
     def _error_result(self, url: str, error_message: str) -> Dict[str, Any]:
         """
@@ -200,7 +544,7 @@ class WebScraperTool:
             "url": url,
             "title": None,
             "content": None,
-            "retrieved_at": datetime.now().isoformat(),
+            "retrieved_at": _iso_now(),
             "status": "error",
             "error": error_message
         }
@@ -226,27 +570,32 @@ class WebScraperTool:
             if result["status"] != "success":
                 return []
             
-            soup = BeautifulSoup(result["content"], 'html.parser')
-            links = []
-            base_domain = urlparse(url).netloc
+            tree = lxml.html.document_fromstring(result["content"])
+            links: Dict[str, None] = {}  # ordered set
+            base = urlparse(url)
+            base_domain = base.netloc
+            origin = f"{base.scheme}://{base_domain}"
+            same_domain_prefixes = (f"http://{base_domain}", f"https://{base_domain}")
             
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+            for link in tree.iterfind('.//a[@href]'):
+                href = link.get('href')
                 
                 # Convert relative URLs to absolute
-                if href.startswith('/'):
-                    href = f"{urlparse(url).scheme}://{base_domain}{href}"
-                elif not href.startswith('http'):
+                if href[:1] == '/':
+                    href = origin + href
+                elif href[:4] != 'http':
                     continue
                 
-                # Filter by domain if requested
+                # Filter by domain if requested (prefix checks instead of parsing every link)
                 if filter_domain:
-                    if urlparse(href).netloc == base_domain:
-                        links.append(href)
+                    for prefix in same_domain_prefixes:
+                        if href.startswith(prefix) and href[len(prefix):len(prefix) + 1] in ('', '/', '?', '#'):
+                            links[href] = None
+                            break
                 else:
-                    links.append(href)
+                    links[href] = None
             
-            return list(set(links))  # Remove duplicates
+            return list(links)
             
         except Exception as e:
             logger.error(f"Error extracting links from {url}: {e}")
@@ -4,10 +4,12 @@ Manages citation numbering, reference linking, and source attribution.
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+import sys
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
-import json
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,11 @@ logger = logging.getLogger(__name__)
 class Citation:
     """Represents a single citation/source."""
     
+    __slots__ = (
+        "citation_id", "source", "url", "retrieved_at", "content_snippet", "metadata",
+        "_date_str", "_date_src"
+    )
+    
     def __init__(
         self,
         citation_id: int,
@@ -41,6 +48,18 @@ class Citation:
         self.retrieved_at = retrieved_at or datetime.now()
         self.content_snippet = content_snippet
         self.metadata = metadata or {}
+        self._date_str: Optional[str] = None
+        self._date_src: Optional[datetime] = None
+    
+    @property
+    def retrieved_at_str(self) -> Optional[str]:
+        """Retrieval date as YYYY-MM-DD (None unless retrieved_at is a datetime), formatted once."""
+        if not isinstance(self.retrieved_at, datetime):
+            return None
+        if self._date_src is not self.retrieved_at:
+            self._date_str = self.retrieved_at.strftime('%Y-%m-%d')
+            self._date_src = self.retrieved_at
+        return self._date_str
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert citation to dictionary."""
@@ -53,6 +72,17 @@ class Citation:
             "metadata": self.metadata
         }
     
+    def to_dict_fast(self) -> Dict[str, Any]:
+        """Convert citation to dictionary, leaving retrieved_at for orjson to serialize."""
+        return {
+            "id": self.citation_id,
+            "source": self.source,
+            "url": self.url,
+            "retrieved_at": self.retrieved_at,
+            "content_snippet": self.content_snippet,
+            "metadata": self.metadata
+        }
+    
     def format(self, style: str = "numbered") -> str:
         """
         Format citation according to style.
@@ -63,21 +93,37 @@ class Citation:
         Returns:
             Formatted citation string
         """
-        if style == "numbered":
-            formatted = f"[{self.citation_id}] {self.source}"
-            if self.url:
-                formatted += f" - {self.url}"
-            if isinstance(self.retrieved_at, datetime):
-                formatted += f" (Retrieved: {self.retrieved_at.strftime('%Y-%m-%d')})"
-            return formatted
-        elif style == "apa":
-            # Simplified APA format
-            formatted = f"{self.source}."
-            if self.url:
-                formatted += f" Retrieved from {self.url}"
-            return formatted
-        else:
-            return f"{self.source}"
+        return _STYLE_FORMATTERS.get(style, _format_plain)(self)
+
+
+def _format_numbered(citation: Citation) -> str:
+    """Numbered style: [id] source - url (Retrieved: date)."""
+    formatted = f"[{citation.citation_id}] {citation.source}"
+    if citation.url:
+        formatted += f" - {citation.url}"
+    date_str = citation.retrieved_at_str
+    if date_str:
+        formatted += f" (Retrieved: {date_str})"
+    return formatted
+
+
+def _format_apa(citation: Citation) -> str:
+    """Simplified APA style."""
+    formatted = f"{citation.source}."
+    if citation.url:
+        formatted += f" Retrieved from {citation.url}"
+    return formatted
+
+
+def _format_plain(citation: Citation) -> str:
+    """Fallback for unknown styles: the source alone."""
+    return f"{citation.source}"
+
+
+_STYLE_FORMATTERS = {
+    "numbered": _format_numbered,
+    "apa": _format_apa,
+}
 
 
 class CitationManager:
@@ -90,7 +136,10 @@ class CitationManager:
         """Initialize citation manager."""
         self.citations: List[Citation] = []
         self.citation_map: Dict[str, int] = {}  # URL/source -> citation_id
+        self._by_id: Dict[int, Citation] = {}  # citation_id -> Citation
         self.next_id = 1
+        self._version = 0  # Bumped whenever the set of citations changes
+        self._format_cache: Dict[Tuple[str, int], str] = {}  # (style, version) -> format_all output
         logger.info("Citation Manager initialized")
     
     def add_citation(
@@ -114,8 +163,8 @@ class CitationManager:
         Returns:
             Citation ID (1-indexed)
         """
-        # Check if citation already exists
-        citation_key = url or source
+        # Check if citation already exists (source names repeat, so intern them)
+        citation_key = url if url else sys.intern(source)
         if citation_key in self.citation_map:
             return self.citation_map[citation_key]
         
@@ -131,6 +180,8 @@ class CitationManager:
         
         self.citations.append(citation)
         self.citation_map[citation_key] = self.next_id
+        self._by_id[citation.citation_id] = citation
+        self._version += 1
         
         logger.info(f"Added citation #{self.next_id}: {source}")
         
@@ -147,10 +198,7 @@ class CitationManager:
         Returns:
             Citation object or None
         """
-        for citation in self.citations:
-            if citation.citation_id == citation_id:
-                return citation
-        return None
+        return self._by_id.get(citation_id)
     
     def get_all_citations(self) -> List[Citation]:
         """Get all citations."""
@@ -169,11 +217,21 @@ class CitationManager:
         if not self.citations:
             return "## References\n\nNo citations available."
         
+        key = (style, self._version)
+        cached = self._format_cache.get(key)
+        if cached is not None:
+            return cached
+        
         lines = ["## References\n"]
         for citation in self.citations:
             lines.append(citation.format(style))
         
-        return "\n".join(lines)
+        formatted = "\n".join(lines)
+        # Older versions can never be requested again
+        if self._format_cache and next(iter(self._format_cache))[1] != self._version:
+            self._format_cache.clear()
+        self._format_cache[key] = formatted
+        return formatted
     
     def get_citations_by_ids(self, citation_ids: List[int]) -> List[Citation]:
         """
@@ -185,7 +243,7 @@ class CitationManager:
         Returns:
             List of Citation objects
         """
-        return [c for c in self.citations if c.citation_id in citation_ids]
+        return [self._by_id[i] for i in citation_ids if i in self._by_id]
     
     def save_to_file(self, filepath: Path):
         """
@@ -195,10 +253,10 @@ class CitationManager:
             filepath: Path to save file
         """
         try:
-            citations_data = [c.to_dict() for c in self.citations]
+            citations_data = [c.to_dict_fast() for c in self.citations]
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(citations_data, f, indent=2)
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(citations_data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS))
             
             logger.info(f"Citations saved to {filepath}")
             
@@ -214,29 +272,31 @@ class CitationManager:
             filepath: Path to load from
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                citations_data = json.load(f)
+            with open(filepath, 'rb') as f:
+                citations_data = orjson.loads(f.read())
             
-            for data in citations_data:
-                retrieved_at = data.get("retrieved_at")
-                if retrieved_at:
-                    retrieved_at = datetime.fromisoformat(retrieved_at)
-                
-                citation = Citation(
+            fromiso = datetime.fromisoformat
+            new_citations = [
+                Citation(
                     citation_id=data["id"],
                     source=data["source"],
                     url=data.get("url"),
-                    retrieved_at=retrieved_at,
+                    retrieved_at=fromiso(data["retrieved_at"]) if data.get("retrieved_at") else None,
                     content_snippet=data.get("content_snippet"),
                     metadata=data.get("metadata", {})
                 )
-                
-                self.citations.append(citation)
-                citation_key = citation.url or citation.source
-                self.citation_map[citation_key] = citation.citation_id
-                
-                if citation.citation_id >= self.next_id:
-                    self.next_id = citation.citation_id + 1
+                for data in citations_data
+            ]
+            
+            self.citations.extend(new_citations)
+            self.citation_map.update(
+                (c.url if c.url else sys.intern(c.source), c.citation_id) for c in new_citations
+            )
+            self._by_id.update((c.citation_id, c) for c in new_citations)
+            
+            max_id = max((c.citation_id for c in new_citations), default=0)
+            self.next_id = max(self.next_id, max_id + 1)
+            self._version += 1
             
             logger.info(f"Loaded {len(citations_data)} citations from {filepath}")
             
@@ -248,7 +308,10 @@ class CitationManager:
         """Clear all citations."""
         self.citations = []
         self.citation_map = {}
+        self._by_id = {}
         self.next_id = 1
+        self._version += 1
+        self._format_cache = {}
         logger.info("Citations cleared")
     
     def get_statistics(self) -> Dict[str, Any]:
@@ -259,8 +322,12 @@ class CitationManager:
             Dictionary with statistics
         """
         total = len(self.citations)
-        with_urls = len([c for c in self.citations if c.url])
-        with_snippets = len([c for c in self.citations if c.content_snippet])
+        with_urls = with_snippets = 0
+        for c in self.citations:
+            if c.url:
+                with_urls += 1
+            if c.content_snippet:
+                with_snippets += 1
         
         return {
             "total_citations": total,
@@ -4,22 +4,50 @@ Supports embedding charts and formatting report sections.
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional, Set
 from pathlib import Path
 from datetime import datetime
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Image, Table, TableStyle
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
-
 from utils.citation_manager import CitationManager
 from config import settings
 
+# reportlab is imported where it is used, so importing this module stays cheap
+if TYPE_CHECKING:
+    from reportlab.platypus import Flowable
+
 logger = logging.getLogger(__name__)
 
+# Inline citation markers such as [1], rendered as superscript links to their reference
+_CITE_RE = re.compile(r'\[(\d+)\]')
+_CITE_TEMPLATE = r'<super><a href="#ref\1">[\1]</a></super>'
+
+
+# Upper bound on threads used to check chart files
+MAX_STAT_WORKERS = 8
+# Below this many paths, starting the pool costs more than the stat calls it overlaps
+CONCURRENT_STAT_THRESHOLD = 64
+
+
+def _existing_paths(paths: Set[str]) -> Set[str]:
+    """Return the paths that exist, checking large sets concurrently (stat releases the GIL)."""
+    if len(paths) < CONCURRENT_STAT_THRESHOLD:
+        return {path for path in paths if os.path.exists(path)}
+    
+    ordered = list(paths)
+    with ThreadPoolExecutor(max_workers=min(MAX_STAT_WORKERS, len(ordered))) as pool:
+        found = pool.map(os.path.exists, ordered)
+    return {path for path, exists in zip(ordered, found) if exists}
+
+
+@lru_cache(maxsize=2048)
+def _format_citations_cached(text: str) -> str:
+    """Format citation markers in a paragraph (memoized; reports repeat paragraphs)."""
+    return _CITE_RE.sub(_CITE_TEMPLATE, text)
+
 
 class PDFReportGenerator:
     """
@@ -36,6 +64,8 @@ class PDFReportGenerator:
         self.output_dir = output_dir or Path(settings.reports_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        from reportlab.lib.styles import getSampleStyleSheet
+        
         # Setup styles
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
@@ -44,6 +74,10 @@ class PDFReportGenerator:
     
     def _setup_custom_styles(self):
         """Setup custom paragraph styles."""
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+        from reportlab.lib.styles import ParagraphStyle
+        
         # Title style
         self.styles.add(ParagraphStyle(
             name='CustomTitle',
@@ -92,6 +126,15 @@ class PDFReportGenerator:
             textColor=colors.HexColor('#7f8c8d'),
             leftIndent=20
         ))
+        
+        # Bind the styles used while building the story
+        self._s_title = self.styles['CustomTitle']
+        self._s_topic = self.styles['Heading2']
+        self._s_section = self.styles['SectionHeading']
+        self._s_sub = self.styles['SubsectionHeading']
+        self._s_body = self.styles['JustifiedBody']
+        self._s_cite = self.styles['Citation']
+        self._s_normal = self.styles['Normal']
     
     def generate_report(
         self,
@@ -110,6 +153,9 @@ class PDFReportGenerator:
         Returns:
             Path to generated PDF
         """
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import PageBreak, SimpleDocTemplate
+        
         try:
             # Generate filename
             if not output_filename:
@@ -166,156 +212,145 @@ class PDFReportGenerator:
             logger.error(f"Error generating PDF report: {e}")
             raise
     
-    def _create_title_page(self, report_data: Dict[str, Any]) -> List:
+    def _create_title_page(self, report_data: Dict[str, Any]) -> Iterator['Flowable']:
         """Create title page elements."""
-        elements = []
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
         
         # Title
         title = report_data.get("title", "Market Research Report")
-        elements.append(Spacer(1, 2*inch))
-        elements.append(Paragraph(title, self.styles['CustomTitle']))
-        elements.append(Spacer(1, 0.5*inch))
+        yield Spacer(1, 2*inch)
+        yield Paragraph(title, self._s_title)
+        yield Spacer(1, 0.5*inch)
         
         # Subtitle/Topic
         topic = report_data.get("topic", "")
         if topic:
-            elements.append(Paragraph(topic, self.styles['Heading2']))
-            elements.append(Spacer(1, 0.3*inch))
+            yield Paragraph(topic, self._s_topic)
+            yield Spacer(1, 0.3*inch)
         
         # Date
         date = report_data.get("date", datetime.now().strftime("%B %d, %Y"))
-        elements.append(Paragraph(f"Generated: {date}", self.styles['Normal']))
+        yield Paragraph(f"Generated: {date}", self._s_normal)
         
         # Metadata
         metadata = report_data.get("metadata", {})
         if metadata:
-            elements.append(Spacer(1, 1*inch))
+            yield Spacer(1, 1*inch)
             for key, value in metadata.items():
-                elements.append(Paragraph(f"<b>{key}:</b> {value}", self.styles['Normal']))
-        
-        return elements
+                yield Paragraph(f"<b>{key}:</b> {value}", self._s_normal)
     
-    def _create_toc(self, report_data: Dict[str, Any]) -> List:
+    def _create_toc(self, report_data: Dict[str, Any]) -> Iterator['Flowable']:
         """Create table of contents."""
-        elements = []
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
         
-        elements.append(Paragraph("Table of Contents", self.styles['SectionHeading']))
-        elements.append(Spacer(1, 0.3*inch))
+        yield Paragraph("Table of Contents", self._s_section)
+        yield Spacer(1, 0.3*inch)
         
+        # One line per section, in a single flowable
         sections = report_data.get("sections", [])
-        for i, section in enumerate(sections, 1):
-            title = section.get("title", f"Section {i}")
-            elements.append(Paragraph(f"{i}. {title}", self.styles['Normal']))
-            elements.append(Spacer(1, 0.1*inch))
-        
-        return elements
+        toc_lines = [f"{i}. {section.get('title', f'Section {i}')}" for i, section in enumerate(sections, 1)]
+        if toc_lines:
+            yield Paragraph("<br/>".join(toc_lines), self._s_normal)
     
-    def _create_section(self, section: Dict[str, Any]) -> List:
+    def _create_section(self, section: Dict[str, Any]) -> Iterator['Flowable']:
         """Create a report section."""
-        elements = []
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
         
         # Section title
         title = section.get("title", "Untitled Section")
-        elements.append(Paragraph(title, self.styles['SectionHeading']))
-        elements.append(Spacer(1, 0.2*inch))
+        yield Paragraph(title, self._s_section)
+        yield Spacer(1, 0.2*inch)
         
         # Section content
         content = section.get("content", "")
         
         # Split content by paragraphs
-        paragraphs = content.split('\n\n')
-        for para in paragraphs:
-            if para.strip():
-                # Check if it's a subsection heading (starts with ##)
-                if para.strip().startswith('##'):
-                    heading_text = para.strip().replace('##', '').strip()
-                    elements.append(Paragraph(heading_text, self.styles['SubsectionHeading']))
-                else:
-                    # Add citation markers [1], [2], etc. as superscript
-                    formatted_para = self._format_citations(para)
-                    elements.append(Paragraph(formatted_para, self.styles['JustifiedBody']))
-                
-                elements.append(Spacer(1, 0.15*inch))
-        
-        elements.append(Spacer(1, 0.3*inch))
-        
-        return elements
-    
-    def _format_citations(self, text: str) -> str:
-        """Format citation markers in text."""
-        # Convert [1] style citations to superscript
-        import re
-        
-        def replace_citation(match):
-            num = match.group(1)
-            return f'<super><a href="#ref{num}">[{num}]</a></super>'
+        for raw in content.split('\n\n'):
+            para = raw.strip()
+            if not para:
+                continue
+            
+            # Check if it's a subsection heading (starts with ##)
+            if para.startswith('##'):
+                heading_text = para.replace('##', '').strip()
+                yield Paragraph(heading_text, self._s_sub)
+            else:
+                # Add citation markers [1], [2], etc. as superscript
+                formatted_para = _format_citations_cached(raw)
+                yield Paragraph(formatted_para, self._s_body)
+            
+            yield Spacer(1, 0.15*inch)
         
-        formatted = re.sub(r'\[(\d+)\]', replace_citation, text)
-        return formatted
+        yield Spacer(1, 0.3*inch)
     
-    def _create_visualizations_section(self, visualizations: List[Dict[str, Any]]) -> List:
+    def _create_visualizations_section(self, visualizations: List[Dict[str, Any]]) -> Iterator['Flowable']:
         """Create visualizations section."""
-        elements = []
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Image, Paragraph, Spacer
         
-        elements.append(Paragraph("Visualizations", self.styles['SectionHeading']))
-        elements.append(Spacer(1, 0.2*inch))
+        yield Paragraph("Visualizations", self._s_section)
+        yield Spacer(1, 0.2*inch)
+        
+        # Check every chart file up front instead of one stat per loop iteration
+        existing = _existing_paths({
+            path for path in (viz.get("png_path") or viz.get("html_path") for viz in visualizations) if path
+        })
         
         for viz in visualizations:
             # Visualization title
             title = viz.get("title", "Chart")
-            elements.append(Paragraph(title, self.styles['SubsectionHeading']))
+            yield Paragraph(title, self._s_sub)
             
             # Add image if path provided
             image_path = viz.get("png_path") or viz.get("html_path")
-            if image_path and Path(image_path).exists():
+            if image_path in existing:
                 try:
                     img = Image(image_path, width=6*inch, height=4*inch)
-                    elements.append(img)
+                    yield img
                 except Exception as e:
                     logger.warning(f"Could not add image {image_path}: {e}")
-                    elements.append(Paragraph(f"[Chart: {title}]", self.styles['Normal']))
+                    yield Paragraph(f"[Chart: {title}]", self._s_normal)
             else:
-                elements.append(Paragraph(f"[Chart: {title}]", self.styles['Normal']))
+                yield Paragraph(f"[Chart: {title}]", self._s_normal)
             
             # Description
             description = viz.get("description", "")
             if description:
-                elements.append(Spacer(1, 0.1*inch))
-                elements.append(Paragraph(description, self.styles['Normal']))
+                yield Spacer(1, 0.1*inch)
+                yield Paragraph(description, self._s_normal)
             
-            elements.append(Spacer(1, 0.3*inch))
-        
-        return elements
+            yield Spacer(1, 0.3*inch)
     
-    def _create_references(self, citation_manager: CitationManager) -> List:
+    def _create_references(self, citation_manager: CitationManager) -> Iterator['Flowable']:
         """Create references section."""
-        elements = []
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
         
-        elements.append(Paragraph("References", self.styles['SectionHeading']))
-        elements.append(Spacer(1, 0.2*inch))
+        yield Paragraph("References", self._s_section)
+        yield Spacer(1, 0.2*inch)
         
         citations = citation_manager.get_all_citations()
         
         if not citations:
-            elements.append(Paragraph("No references available.", self.styles['Normal']))
-            return elements
+            yield Paragraph("No references available.", self._s_normal)
+            return
         
+        # All references go into one flowable, separated by blank lines
+        parts = []
         for citation in citations:
             # Format citation with anchor for linking
-            citation_text = f'<a name="ref{citation.citation_id}"></a>[{citation.citation_id}] {citation.source}'
+            fragments = [f'<a name="ref{citation.citation_id}"></a>[{citation.citation_id}] {citation.source}']
             if citation.url:
-                citation_text += f' - <link href="{citation.url}">{citation.url}</link>'
+                fragments.append(f' - <link href="{citation.url}">{citation.url}</link>')
             if citation.retrieved_at:
-                if isinstance(citation.retrieved_at, datetime):
-                    date_str = citation.retrieved_at.strftime('%Y-%m-%d')
-                else:
-                    date_str = str(citation.retrieved_at)[:10]
-                citation_text += f' (Retrieved: {date_str})'
-            
-            elements.append(Paragraph(citation_text, self.styles['Citation']))
-            elements.append(Spacer(1, 0.1*inch))
+                date_str = citation.retrieved_at_str or str(citation.retrieved_at)[:10]
+                fragments.append(f' (Retrieved: {date_str})')
+            parts.append(''.join(fragments))
         
-        return elements
+        yield Paragraph('<br/><br/>'.join(parts), self._s_cite)
 
 
 def create_pdf_generator(output_dir: Optional[Path] = None) -> PDFReportGenerator:
@@ -3,40 +3,319 @@ Visualization utility for generating charts and graphs for reports.
 Supports matplotlib and plotly for various chart types.
 """
 
+import hashlib
+import itertools
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Literal, Optional, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 import base64
 from io import BytesIO
 
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Use non-GUI backend
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+import numpy as np
+import orjson
 
 from config import settings
 
+# matplotlib and plotly are imported on first use (see _matplotlib_figure and _pio)
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
 logger = logging.getLogger(__name__)
 
+# Plotly template applied to every chart
+PLOTLY_TEMPLATE = 'plotly_white'
+
+# Matplotlib style applied before the first matplotlib chart
+MATPLOTLIB_STYLE = 'seaborn-v0_8-darkgrid'
+
+# Axes rect per figure size, fixed instead of recomputed by tight_layout for every chart
+_SUBPLOT_RECTS = {
+    (10, 6): {'left': 0.1, 'right': 0.95, 'top': 0.92, 'bottom': 0.12},  # Line, bar and scatter
+    (10, 8): {'left': 0.05, 'right': 0.95, 'top': 0.92, 'bottom': 0.05},  # Pie (no axis labels)
+}
+
+
+@lru_cache(maxsize=None)
+def _matplotlib_figure() -> type:
+    """Import matplotlib with the non-GUI backend and chart style, returning its Figure class."""
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-GUI backend
+    import matplotlib.style
+    from matplotlib.figure import Figure
+    
+    matplotlib.style.use(MATPLOTLIB_STYLE)
+    return Figure
+
+
+@lru_cache(maxsize=None)
+def _pio():
+    """Import plotly.io, encoding figure JSON with orjson (a pinned dependency)."""
+    import plotly.io as pio
+    
+    pio.json.config.default_engine = 'orjson'
+    return pio
+
+
+@lru_cache(maxsize=None)
+def _plotly_template() -> Dict[str, Any]:
+    """Resolved template as a plain dict (unvalidated figures cannot refer to templates by name)."""
+    return _pio().templates[PLOTLY_TEMPLATE].to_plotly_json()
+
+# Default chart ids: process start time plus a counter, so ids never collide within a second
+_RUN_TS = datetime.now().strftime('%Y%m%d_%H%M%S')
+_chart_counter = itertools.count()
+
+
+def _default_chart_id(chart_type: str) -> str:
+    """Unique chart id for callers that do not pass one."""
+    return f"{chart_type}_{_RUN_TS}_{next(_chart_counter)}"
+
+
+# Value precision: 'auto' stores values as float32 (half the JSON plotly writes) only
+# when that is exact, 'f32' always does, 'f64' never does
+Precision = Literal['auto', 'f32', 'f64']
+
+
+def _as_values(values: Any, precision: Precision) -> np.ndarray:
+    """Convert chart values to a float array of the requested precision."""
+    if precision == 'f32':
+        return np.asarray(values, dtype=np.float32)
+    arr = np.asarray(values, dtype=np.float64)
+    if precision == 'auto':
+        narrow = arr.astype(np.float32)
+        if np.array_equal(narrow, arr, equal_nan=True):
+            return narrow
+    return arr
+
+
+@dataclass(slots=True)
+class ChartSeries:
+    """
+    An x/y series as contiguous arrays.
+    
+    x is a NumPy array when numeric and a list of category labels otherwise.
+    """
+    x: Any
+    y: np.ndarray
+    width: Optional[float] = None  # Bar width in x units (None = renderer default)
+
+
+@dataclass(slots=True)
+class PieSeries:
+    """Pie slices as a list of labels and an array of values."""
+    labels: List[Any]
+    values: np.ndarray
+
+
+def _as_series(data: Dict[str, Any], precision: Precision = 'auto') -> ChartSeries:
+    """
+    Convert a dict-of-lists chart payload to a ChartSeries once, before it
+    reaches matplotlib or plotly (which would otherwise each convert the lists).
+    """
+    if isinstance(data, ChartSeries):
+        return data
+    x = data['x']
+    arr = np.asarray(x)
+    return ChartSeries(
+        x=arr if arr.dtype.kind in 'iuf' else list(x),
+        y=_as_values(data['y'], precision),
+        width=data.get('width')
+    )
+
+
+def _as_pie_series(data: Dict[str, Any], precision: Precision = 'auto') -> PieSeries:
+    """Convert a dict-of-lists pie payload to a PieSeries."""
+    if isinstance(data, PieSeries):
+        return data
+    return PieSeries(
+        labels=list(data['labels']),
+        values=_as_values(data['values'], precision)
+    )
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+    
+    Keeps the first and last points and, from each bucket in between, the point
+    forming the largest triangle with the previously kept point and the mean of
+    the next bucket, which preserves the visual shape of the series.
+    """
+    n = len(x)
+    x = x.astype(np.float64, copy=False)
+    bounds = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        next_end = bounds[i + 2] if i + 2 < len(bounds) else n
+        next_start = end if end < next_end else n - 1
+        avg_x = x[next_start:next_end].mean() if next_end > next_start else x[-1]
+        avg_y = y[next_start:next_end].mean() if next_end > next_start else y[-1]
+        
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(areas.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+def _maybe_downsample(series: ChartSeries, threshold: Optional[int]) -> ChartSeries:
+    """
+    Downsample a long numeric x/y series to at most threshold points with LTTB.
+    
+    Only applies when x is numeric and sorted; other series are returned unchanged.
+    """
+    x, y = series.x, series.y
+    if (
+        not threshold or threshold < 3
+        or not isinstance(x, np.ndarray)
+        or len(x) <= threshold or len(x) != len(y)
+        or np.any(np.diff(x) < 0)
+    ):
+        return series
+    
+    kept = _lttb_indices(x, y, threshold)
+    logger.debug("Downsampled series from %s to %s points", len(x), len(kept))
+    return ChartSeries(x=x[kept], y=y[kept], width=series.width)
+
+
+# How plotly HTML files load plotly.js: a shared bundle next to the charts, or the plotly CDN
+PlotlyJS = Literal['directory', 'cdn']
+PLOTLYJS_BUNDLE = "plotly.min.js"
+
+# Standalone page for one plotly chart (the same page pio.to_html builds, filled in directly)
+_PLOTLY_HTML_TEMPLATE = (
+    '<html>\n<head><meta charset="utf-8" /></head>\n<body>\n'
+    '<script charset="utf-8" src="{src}"></script>\n'
+    '<div id="chart" class="plotly-graph-div" style="height:100%; width:100%;"></div>\n'
+    '<script type="text/javascript">Plotly.newPlot("chart", {data}, {layout}, {{"responsive": true}});</script>\n'
+    '</body>\n</html>\n'
+)
+
+
+@lru_cache(maxsize=None)
+def _plotlyjs_cdn_url() -> str:
+    """CDN URL of the plotly.js version bundled with the installed plotly."""
+    from plotly.offline import get_plotlyjs_version
+    return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize what orjson cannot: non-contiguous arrays as lists, anything else as str."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+def _script_json(obj: Any) -> str:
+    """JSON for embedding in a <script> block."""
+    text = orjson.dumps(obj, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return text.replace('</', '<\\/')
+
+# Rendered charts remembered per generator (least recently used are evicted)
+RENDER_CACHE_SIZE = 64
+
+
+def _render_key(
+    chart_type: str,
+    use_plotly: bool,
+    dpi: int,
+    series: Union[ChartSeries, PieSeries],
+    *labels: str
+) -> bytes:
+    """Hash everything that determines a rendered chart into a cache key."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{chart_type}|{use_plotly}|{dpi}|{labels!r}".encode())
+    for field in fields(series):
+        values = getattr(series, field.name)
+        digest.update(field.name.encode())
+        if isinstance(values, np.ndarray):
+            digest.update(values.dtype.str.encode())
+            digest.update(np.ascontiguousarray(values).tobytes())
+        else:
+            digest.update(repr(values).encode())
+    return digest.digest()
+
+
+def _output_path(path: Path) -> Path:
+    """
+    Clear a chart file before it is written.
+    
+    Rendered files may be hard-linked into the render cache, so they are
+    replaced with a new file rather than overwritten in place.
+    """
+    path.unlink(missing_ok=True)
+    return path
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """Hard-link a rendered file to a new path, copying when linking is not possible."""
+    _output_path(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
 
 class ChartGenerator:
     """Generator for various types of charts and visualizations."""
     
-    def __init__(self, output_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        output_dir: Optional[Path] = None,
+        dpi: int = 150,
+        downsample_threshold: Optional[int] = 2000,
+        plotlyjs: PlotlyJS = 'directory',
+        render_cache_size: int = RENDER_CACHE_SIZE
+    ):
         """
         Initialize chart generator.
         
         Args:
             output_dir: Directory to save generated charts
+            dpi: Resolution of matplotlib PNGs (raise to 300 for print-quality output)
+            downsample_threshold: Max points drawn for line and scatter charts (None = draw all)
+            plotlyjs: 'directory' writes plotly.min.js once into output_dir for all HTML
+                charts (works offline), 'cdn' loads it from the plotly CDN
+            render_cache_size: Identical renders remembered for reuse (0 disables the cache)
         """
         self.output_dir = output_dir or Path(settings.reports_dir) / "charts"
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.dpi = dpi
+        self.downsample_threshold = downsample_threshold
+        self.plotlyjs = plotlyjs
+        self._plotlyjs_written = False
+        
+        # Matplotlib figures reused across charts, one per figsize and thread (Agg is not thread-safe)
+        self._fig_local = threading.local()
         
-        # Set matplotlib style
-        plt.style.use('seaborn-v0_8-darkgrid')
+        # Identical charts are not re-rendered: render key -> result of the first render
+        self._render_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._render_cache_lock = threading.Lock()
+        self.render_cache_size = render_cache_size
+        # Private directory holding the cached files, created on first use (see _cache_dir)
+        self._render_cache_tmp: Optional[tempfile.TemporaryDirectory] = None
+        
+        # Plotly PNG exports deferred to flush_png_exports() (PNG path -> figure), and
+        # render-cache links waiting on them (PNG path -> cache path). Keyed by path so
+        # each caller flushes only its own charts.
+        self._pending_png: Dict[Path, Dict[str, Any]] = {}
+        self._pending_links: Dict[Path, Path] = {}
         
         logger.info("Chart Generator initialized")
     
@@ -47,33 +326,40 @@ class ChartGenerator:
         x_label: str,
         y_label: str,
         chart_id: Optional[str] = None,
-        use_plotly: bool = True
+        use_plotly: bool = True,
+        precision: Precision = 'auto'
     ) -> Dict[str, Any]:
         """
         Create a line chart.
         
         Args:
-            data: Dictionary with 'x' and 'y' keys containing data lists
+            data: Dictionary with 'x' and 'y' keys containing data lists (or a ChartSeries)
             title: Chart title
             x_label: X-axis label
             y_label: Y-axis label
             chart_id: Optional chart identifier
             use_plotly: Use plotly (True) or matplotlib (False)
+            precision: 'auto' stores values as float32 when that is exact, 'f32' always
+                (smaller output, ~7 significant digits), 'f64' keeps full precision
             
         Returns:
             Dictionary with chart filepath and metadata
         """
-        try:
-            chart_id = chart_id or f"line_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            if use_plotly:
-                return self._create_plotly_line_chart(data, title, x_label, y_label, chart_id)
-            else:
-                return self._create_matplotlib_line_chart(data, title, x_label, y_label, chart_id)
-                
-        except Exception as e:
-            logger.error(f"Error creating line chart: {e}")
-            raise
+        chart_id = chart_id or _default_chart_id('line_chart')
+        series = _maybe_downsample(_as_series(data, precision), self.downsample_threshold)
+        
+        key = _render_key('line_chart', use_plotly, self.dpi, series, title, x_label, y_label)
+        cached = self._cached_render(key, chart_id)
+        if cached is not None:
+            return cached
+        
+        if use_plotly:
+            result = self._create_plotly_line_chart(series, title, x_label, y_label, chart_id)
+        else:
+            result = self._create_matplotlib_line_chart(series, title, x_label, y_label, chart_id)
+        
+        self._remember_render(key, result)
+        return result
     
     def create_bar_chart(
         self,
@@ -82,64 +368,78 @@ class ChartGenerator:
         x_label: str,
         y_label: str,
         chart_id: Optional[str] = None,
-        use_plotly: bool = True
+        use_plotly: bool = True,
+        precision: Precision = 'auto'
     ) -> Dict[str, Any]:
         """
         Create a bar chart.
         
         Args:
-            data: Dictionary with 'x' and 'y' keys containing data lists
+            data: Dictionary with 'x' and 'y' keys containing data lists (or a ChartSeries)
             title: Chart title
             x_label: X-axis label
             y_label: Y-axis label
             chart_id: Optional chart identifier
             use_plotly: Use plotly (True) or matplotlib (False)
+            precision: 'auto' stores values as float32 when that is exact, 'f32' always
+                (smaller output, ~7 significant digits), 'f64' keeps full precision
             
         Returns:
             Dictionary with chart filepath and metadata
         """
-        try:
-            chart_id = chart_id or f"bar_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            if use_plotly:
-                return self._create_plotly_bar_chart(data, title, x_label, y_label, chart_id)
-            else:
-                return self._create_matplotlib_bar_chart(data, title, x_label, y_label, chart_id)
-                
-        except Exception as e:
-            logger.error(f"Error creating bar chart: {e}")
-            raise
+        chart_id = chart_id or _default_chart_id('bar_chart')
+        series = _as_series(data, precision)
+        
+        key = _render_key('bar_chart', use_plotly, self.dpi, series, title, x_label, y_label)
+        cached = self._cached_render(key, chart_id)
+        if cached is not None:
+            return cached
+        
+        if use_plotly:
+            result = self._create_plotly_bar_chart(series, title, x_label, y_label, chart_id)
+        else:
+            result = self._create_matplotlib_bar_chart(series, title, x_label, y_label, chart_id)
+        
+        self._remember_render(key, result)
+        return result
     
     def create_pie_chart(
         self,
         data: Dict[str, List],
         title: str,
         chart_id: Optional[str] = None,
-        use_plotly: bool = True
+        use_plotly: bool = True,
+        precision: Precision = 'auto'
     ) -> Dict[str, Any]:
         """
         Create a pie chart.
         
         Args:
-            data: Dictionary with 'labels' and 'values' keys
+            data: Dictionary with 'labels' and 'values' keys (or a PieSeries)
             title: Chart title
             chart_id: Optional chart identifier
             use_plotly: Use plotly (True) or matplotlib (False)
+            precision: 'auto' stores values as float32 when that is exact, 'f32' always
+                (smaller output, ~7 significant digits), 'f64' keeps full precision
             
         Returns:
             Dictionary with chart filepath and metadata
         """
-        try:
-            chart_id = chart_id or f"pie_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            if use_plotly:
-                return self._create_plotly_pie_chart(data, title, chart_id)
-            else:
-                return self._create_matplotlib_pie_chart(data, title, chart_id)
-                
-        except Exception as e:
-            logger.error(f"Error creating pie chart: {e}")
-            raise
+        chart_id = chart_id or _default_chart_id('pie_chart')
+        series = _as_pie_series(data, precision)
+        
+        key = _render_key('pie_chart', use_plotly, self.dpi, series, title)
+        cached = self._cached_render(key, chart_id)
+        if cached is not None:
+            return cached
+        
+        if use_plotly:
+            result = self._create_plotly_pie_chart(series, title, chart_id)
+        else:
+            result = self._create_matplotlib_pie_chart(series, title, chart_id)
+        
+        self._remember_render(key, result)
+        return result
     
     def create_scatter_plot(
         self,
@@ -148,260 +448,534 @@ class ChartGenerator:
         x_label: str,
         y_label: str,
         chart_id: Optional[str] = None,
-        use_plotly: bool = True
+        use_plotly: bool = True,
+        precision: Precision = 'auto'
     ) -> Dict[str, Any]:
         """
         Create a scatter plot.
         
         Args:
-            data: Dictionary with 'x' and 'y' keys containing data lists
+            data: Dictionary with 'x' and 'y' keys containing data lists (or a ChartSeries)
             title: Chart title
             x_label: X-axis label
             y_label: Y-label
             chart_id: Optional chart identifier
             use_plotly: Use plotly (True) or matplotlib (False)
+            precision: 'auto' stores values as float32 when that is exact, 'f32' always
+                (smaller output, ~7 significant digits), 'f64' keeps full precision
             
         Returns:
             Dictionary with chart filepath and metadata
         """
-        try:
-            chart_id = chart_id or f"scatter_plot_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        chart_id = chart_id or _default_chart_id('scatter_plot')
+        series = _maybe_downsample(_as_series(data, precision), self.downsample_threshold)
+        
+        key = _render_key('scatter_plot', use_plotly, self.dpi, series, title, x_label, y_label)
+        cached = self._cached_render(key, chart_id)
+        if cached is not None:
+            return cached
+        
+        if use_plotly:
+            result = self._create_plotly_scatter(series, title, x_label, y_label, chart_id)
+        else:
+            result = self._create_matplotlib_scatter(series, title, x_label, y_label, chart_id)
+        
+        self._remember_render(key, result)
+        return result
+    
+    def create_histogram(
+        self,
+        values: List[float],
+        title: str,
+        x_label: str,
+        y_label: str = "Count",
+        bins: int = 50,
+        chart_id: Optional[str] = None,
+        use_plotly: bool = True,
+        precision: Precision = 'auto'
+    ) -> Dict[str, Any]:
+        """
+        Create a histogram.
+        
+        The values are binned once with NumPy and drawn as a bar chart, so
+        neither matplotlib nor plotly re-bins the raw data.
+        
+        Args:
+            values: Raw values to bin
+            title: Chart title
+            x_label: X-axis label
+            y_label: Y-axis label
+            bins: Number of bins
+            chart_id: Optional chart identifier
+            use_plotly: Use plotly (True) or matplotlib (False)
+            precision: 'auto' stores values as float32 when that is exact, 'f32' always
+                (smaller output, ~7 significant digits), 'f64' keeps full precision
             
-            if use_plotly:
-                return self._create_plotly_scatter(data, title, x_label, y_label, chart_id)
-            else:
-                return self._create_matplotlib_scatter(data, title, x_label, y_label, chart_id)
-                
-        except Exception as e:
-            logger.error(f"Error creating scatter plot: {e}")
-            raise
+        Returns:
+            Dictionary with chart filepath and metadata
+        """
+        arr = np.ascontiguousarray(values, dtype=np.float64)
+        counts, edges = np.histogram(arr, bins=bins)
+        centers = 0.5 * (edges[:-1] + edges[1:])
+        
+        return self.create_bar_chart(
+            data={'x': centers, 'y': counts, 'width': float(edges[1] - edges[0])},
+            title=title,
+            x_label=x_label,
+            y_label=y_label,
+            chart_id=chart_id or _default_chart_id('histogram'),
+            use_plotly=use_plotly,
+            precision=precision
+        )
+    
+    def create_chart(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a chart from a specification.
+        
+        Args:
+            spec: Dictionary with 'type' (line_chart, bar_chart, pie_chart or
+                scatter_plot), 'data' and 'title', plus optional 'x_label',
+                'y_label', 'chart_id', 'use_plotly' and 'precision'
+            
+        Returns:
+            Dictionary with chart filepath and metadata
+        """
+        chart_type = spec.get("type", "line_chart")
+        common = {
+            "data": spec.get("data", {}),
+            "title": spec.get("title", "Chart"),
+            "chart_id": spec.get("chart_id"),
+            "use_plotly": spec.get("use_plotly", True),
+            "precision": spec.get("precision", 'auto')
+        }
+        
+        if chart_type == "pie_chart":
+            return self.create_pie_chart(**common)
+        
+        labels = {"x_label": spec.get("x_label", "X"), "y_label": spec.get("y_label", "Y")}
+        if chart_type == "line_chart":
+            return self.create_line_chart(**common, **labels)
+        if chart_type == "bar_chart":
+            return self.create_bar_chart(**common, **labels)
+        if chart_type == "scatter_plot":
+            return self.create_scatter_plot(**common, **labels)
+        raise ValueError(f"Unknown chart type: {chart_type}")
+    
+    def create_charts_batch(
+        self,
+        specs: List[Dict[str, Any]],
+        max_workers: Optional[int] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Render many charts in parallel worker processes.
+        
+        Workers use the spawn start method (matplotlib is not fork-safe) and
+        write their own PNGs, so results are complete when this returns.
+        Neither this generator's render cache nor one in the workers is used.
+        
+        Args:
+            specs: Chart specifications (see create_chart)
+            max_workers: Worker processes (defaults to the CPU count)
+            
+        Returns:
+            Results in spec order, None for charts that failed
+        """
+        if not specs:
+            return []
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(specs))
+        settings_key = (str(self.output_dir), self.dpi, self.downsample_threshold, self.plotlyjs)
+        context = multiprocessing.get_context('spawn')
+        
+        # Default ids are assigned here; worker processes have their own counters
+        jobs = [
+            (settings_key, spec if spec.get("chart_id") else dict(spec, chart_id=_default_chart_id(spec.get("type", "line_chart"))))
+            for spec in specs
+        ]
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = list(pool.map(_render_one, jobs, chunksize=4))
+        
+        logger.info(f"Rendered {sum(r is not None for r in results)}/{len(specs)} charts in {workers} processes")
+        return results
+    
+    def _cached_render(self, key: bytes, chart_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Reuse an earlier identical render, linking its files under the new chart_id.
+        
+        Returns:
+            Result for chart_id, or None if the chart has to be rendered
+        """
+        if not self.render_cache_size:
+            return None
+        
+        with self._render_cache_lock:
+            cached = self._render_cache.get(key)
+            if cached is None:
+                return None
+            self._render_cache.move_to_end(key)
+        
+        result = dict(cached, chart_id=chart_id, created_at=datetime.now().isoformat())
+        for field in ("html_path", "png_path"):
+            src = cached.get(field)
+            if not src:
+                continue
+            if not src.exists():
+                return None
+            dst = self.output_dir / f"{chart_id}{src.suffix}"
+            _link_or_copy(src, dst)
+            result[field] = str(dst)
+        
+        logger.info("Reused rendered chart for %s", chart_id)
+        return result
+    
+    def _remember_render(self, key: bytes, result: Dict[str, Any]):
+        """
+        Remember a render, keeping its files under the render cache directory.
+        
+        The cache holds its own links so later charts written to the same
+        chart_id cannot change what a cached render points to.
+        """
+        if not self.render_cache_size:
+            return
+        
+        cache_dir = self._cache_dir()
+        cached = dict(result)  # Callers annotate the result they get back
+        for field in ("html_path", "png_path"):
+            path = result.get(field)
+            if path:
+                cached_path = cache_dir / f"{key.hex()}{Path(path).suffix}"
+                if Path(path).exists():
+                    _link_or_copy(Path(path), cached_path)
+                else:
+                    # PNG export still pending; linked by flush_png_exports()
+                    with self._render_cache_lock:
+                        self._pending_links[Path(path)] = cached_path
+                cached[field] = cached_path
+        
+        with self._render_cache_lock:
+            self._render_cache[key] = cached
+            self._render_cache.move_to_end(key)
+            if len(self._render_cache) > self.render_cache_size:
+                _, evicted = self._render_cache.popitem(last=False)
+                for field in ("html_path", "png_path"):
+                    if evicted.get(field):
+                        evicted[field].unlink(missing_ok=True)
+    
+    def _cache_dir(self) -> Path:
+        """
+        This generator's private render cache directory, created on first use.
+        
+        It lives under output_dir (hard links cannot cross filesystems) and is
+        removed by close(), when the generator is garbage collected, or at
+        interpreter exit, so cached files never outlive the generator.
+        """
+        with self._render_cache_lock:
+            if self._render_cache_tmp is None:
+                self._render_cache_tmp = tempfile.TemporaryDirectory(
+                    prefix=".render_cache-", dir=self.output_dir
+                )
+            return Path(self._render_cache_tmp.name)
+    
+    def close(self):
+        """Forget cached renders and remove the render cache directory."""
+        with self._render_cache_lock:
+            tmp, self._render_cache_tmp = self._render_cache_tmp, None
+            self._render_cache.clear()
+            self._pending_links.clear()
+        if tmp is not None:
+            tmp.cleanup()
     
     # Plotly implementations
+    @staticmethod
+    def _make_fig_dict(
+        trace: Dict[str, Any],
+        title: str,
+        x_label: Optional[str] = None,
+        y_label: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build a plotly figure as a plain dict.
+        
+        HTML is filled in from the dict directly and PNGs are exported with
+        validate=False, so the data arrays are never walked by plotly's
+        graph_objects validators.
+        """
+        layout = {"title": {"text": title}, "template": _plotly_template()}
+        if x_label is not None:
+            layout["xaxis"] = {"title": {"text": x_label}}
+        if y_label is not None:
+            layout["yaxis"] = {"title": {"text": y_label}}
+        return {"data": [trace], "layout": layout}
+    
     def _create_plotly_line_chart(
         self,
-        data: Dict[str, List],
+        s: ChartSeries,
         title: str,
         x_label: str,
         y_label: str,
         chart_id: str
     ) -> Dict[str, Any]:
         """Create line chart using plotly."""
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=data['x'],
-            y=data['y'],
-            mode='lines+markers',
-            name=y_label
-        ))
-        
-        fig.update_layout(
-            title=title,
-            xaxis_title=x_label,
-            yaxis_title=y_label,
-            template='plotly_white'
+        fig = self._make_fig_dict(
+            {"type": "scatter", "x": s.x, "y": s.y, "mode": "lines+markers", "name": y_label},
+            title, x_label, y_label
         )
         
         return self._save_plotly_chart(fig, chart_id, 'line_chart')
     
     def _create_plotly_bar_chart(
         self,
-        data: Dict[str, List],
+        s: ChartSeries,
         title: str,
         x_label: str,
         y_label: str,
         chart_id: str
     ) -> Dict[str, Any]:
         """Create bar chart using plotly."""
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=data['x'],
-            y=data['y'],
-            name=y_label
-        ))
-        
-        fig.update_layout(
-            title=title,
-            xaxis_title=x_label,
-            yaxis_title=y_label,
-            template='plotly_white'
+        fig = self._make_fig_dict(
+            {"type": "bar", "x": s.x, "y": s.y, "name": y_label},
+            title, x_label, y_label
         )
         
         return self._save_plotly_chart(fig, chart_id, 'bar_chart')
     
     def _create_plotly_pie_chart(
         self,
-        data: Dict[str, List],
+        s: PieSeries,
         title: str,
         chart_id: str
     ) -> Dict[str, Any]:
         """Create pie chart using plotly."""
-        fig = go.Figure()
-        
-        fig.add_trace(go.Pie(
-            labels=data['labels'],
-            values=data['values']
-        ))
-        
-        fig.update_layout(
-            title=title,
-            template='plotly_white'
+        fig = self._make_fig_dict(
+            {"type": "pie", "labels": s.labels, "values": s.values},
+            title
         )
         
         return self._save_plotly_chart(fig, chart_id, 'pie_chart')
     
     def _create_plotly_scatter(
         self,
-        data: Dict[str, List],
+        s: ChartSeries,
         title: str,
         x_label: str,
         y_label: str,
         chart_id: str
     ) -> Dict[str, Any]:
         """Create scatter plot using plotly."""
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=data['x'],
-            y=data['y'],
-            mode='markers',
-            name='Data Points'
-        ))
-        
-        fig.update_layout(
-            title=title,
-            xaxis_title=x_label,
-            yaxis_title=y_label,
-            template='plotly_white'
+        fig = self._make_fig_dict(
+            {"type": "scatter", "x": s.x, "y": s.y, "mode": "markers", "name": "Data Points"},
+            title, x_label, y_label
         )
         
         return self._save_plotly_chart(fig, chart_id, 'scatter_plot')
     
     def _save_plotly_chart(
         self,
-        fig: go.Figure,
+        fig: Dict[str, Any],
         chart_id: str,
         chart_type: str
     ) -> Dict[str, Any]:
         """Save plotly chart to file."""
         # Save as HTML
-        html_path = self.output_dir / f"{chart_id}.html"
-        fig.write_html(str(html_path))
+        if self.plotlyjs == 'directory':
+            self._write_plotlyjs_bundle()
+            src = PLOTLYJS_BUNDLE
+        else:
+            src = _plotlyjs_cdn_url()
+        html_path = _output_path(self.output_dir / f"{chart_id}.html")
+        html_path.write_bytes(_PLOTLY_HTML_TEMPLATE.format(
+            src=src,
+            data=_script_json(fig["data"]),
+            layout=_script_json(fig["layout"])
+        ).encode('utf-8'))
         
-        # Save as PNG (requires kaleido)
-        try:
-            png_path = self.output_dir / f"{chart_id}.png"
-            fig.write_image(str(png_path))
-            has_png = True
-        except Exception as e:
-            logger.warning(f"Could not save PNG: {e}")
-            png_path = None
-            has_png = False
+        # PNG export is queued and written by flush_png_exports()
+        png_path = _output_path(self.output_dir / f"{chart_id}.png")
+        with self._render_cache_lock:
+            self._pending_png[png_path] = fig
         
-        logger.info(f"Plotly chart saved: {chart_id}")
+        logger.info("Plotly chart saved: %s", chart_id)
         
         return {
             "chart_id": chart_id,
             "chart_type": chart_type,
             "html_path": str(html_path),
-            "png_path": str(png_path) if has_png else None,
+            "png_path": str(png_path),
             "created_at": datetime.now().isoformat()
         }
     
+    def _write_plotlyjs_bundle(self):
+        """Write plotly.min.js into output_dir once, for the HTML charts to share."""
+        if self._plotlyjs_written:
+            return
+        from plotly.offline import get_plotlyjs
+        
+        # Written under a temporary name so readers (or batch workers) never see a partial file
+        bundle = self.output_dir / PLOTLYJS_BUNDLE
+        tmp = bundle.with_name(f"{PLOTLYJS_BUNDLE}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(get_plotlyjs(), encoding='utf-8')
+        os.replace(tmp, bundle)
+        self._plotlyjs_written = True
+    
+    def flush_png_exports(self, png_paths: Iterable[Optional[str]]) -> List[str]:
+        """
+        Write the pending PNGs of the given plotly charts.
+        
+        Exports run back to back through kaleido's persistent process, once
+        all of a report's charts exist. Call this with the png_path of every
+        plotly chart a caller created before using those files. Charts queued
+        by other callers sharing this generator are left for them to flush.
+        
+        Args:
+            png_paths: png_path values of the caller's chart results (None and
+                already-written paths are ignored)
+        
+        Returns:
+            PNG paths that could not be written (e.g. kaleido is not installed)
+        """
+        with self._render_cache_lock:
+            pending = [
+                (self._pending_png.pop(path), path)
+                for path in {Path(p) for p in png_paths if p}
+                if path in self._pending_png
+            ]
+            links = [
+                (path, self._pending_links.pop(path))
+                for _, path in pending
+                if path in self._pending_links
+            ]
+        
+        failed = []
+        pio = _pio() if pending else None
+        for fig, png_path in pending:
+            try:
+                _output_path(png_path).write_bytes(pio.to_image(fig, format='png', validate=False))
+            except Exception as e:
+                logger.warning(f"Could not save PNG: {e}")
+                failed.append(str(png_path))
+        
+        for src, cached_path in links:
+            if src.exists():
+                _link_or_copy(src, cached_path)
+        
+        if pending:
+            logger.info(f"Exported {len(pending) - len(failed)}/{len(pending)} plotly PNGs")
+        return failed
+    
     # Matplotlib implementations
     def _create_matplotlib_line_chart(
         self,
-        data: Dict[str, List],
+        s: ChartSeries,
         title: str,
         x_label: str,
         y_label: str,
         chart_id: str
     ) -> Dict[str, Any]:
         """Create line chart using matplotlib."""
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = self._get_fig((10, 6))
         
-        ax.plot(data['x'], data['y'], marker='o', linewidth=2)
+        ax.plot(s.x, s.y, marker='o', linewidth=2)
         ax.set_title(title, fontsize=14, fontweight='bold')
         ax.set_xlabel(x_label, fontsize=12)
         ax.set_ylabel(y_label, fontsize=12)
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        
         return self._save_matplotlib_chart(fig, chart_id, 'line_chart')
     
     def _create_matplotlib_bar_chart(
         self,
-        data: Dict[str, List],
+        s: ChartSeries,
         title: str,
         x_label: str,
         y_label: str,
         chart_id: str
     ) -> Dict[str, Any]:
         """Create bar chart using matplotlib."""
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = self._get_fig((10, 6))
         
-        ax.bar(data['x'], data['y'])
+        ax.bar(s.x, s.y, width=0.8 if s.width is None else s.width)
         ax.set_title(title, fontsize=14, fontweight='bold')
         ax.set_xlabel(x_label, fontsize=12)
         ax.set_ylabel(y_label, fontsize=12)
         ax.grid(True, alpha=0.3, axis='y')
         
-        plt.tight_layout()
-        
         return self._save_matplotlib_chart(fig, chart_id, 'bar_chart')
     
     def _create_matplotlib_pie_chart(
         self,
-        data: Dict[str, List],
+        s: PieSeries,
         title: str,
         chart_id: str
     ) -> Dict[str, Any]:
         """Create pie chart using matplotlib."""
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig, ax = self._get_fig((10, 8))
         
-        ax.pie(data['values'], labels=data['labels'], autopct='%1.1f%%', startangle=90)
-        ax.set_title(title, fontsize=14, fontweight='bold')
+        # Largest slices first, with percentages formatted here rather than per wedge by autopct
+        order = np.argsort(-s.values, kind='stable')
+        values = s.values[order]
+        pcts = values.astype(np.float64) * (100.0 / values.sum(dtype=np.float64))
+        labels = [f"{s.labels[i]} ({p:.1f}%)" for i, p in zip(order.tolist(), pcts.tolist())]
         
-        plt.tight_layout()
+        ax.pie(values, labels=labels, startangle=90)
+        ax.set_title(title, fontsize=14, fontweight='bold')
         
         return self._save_matplotlib_chart(fig, chart_id, 'pie_chart')
     
     def _create_matplotlib_scatter(
         self,
-        data: Dict[str, List],
+        s: ChartSeries,
         title: str,
         x_label: str,
         y_label: str,
         chart_id: str
     ) -> Dict[str, Any]:
         """Create scatter plot using matplotlib."""
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = self._get_fig((10, 6))
         
-        ax.scatter(data['x'], data['y'], alpha=0.6)
+        ax.scatter(s.x, s.y, alpha=0.6)
         ax.set_title(title, fontsize=14, fontweight='bold')
         ax.set_xlabel(x_label, fontsize=12)
         ax.set_ylabel(y_label, fontsize=12)
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        
         return self._save_matplotlib_chart(fig, chart_id, 'scatter_plot')
     
+    def _get_fig(self, figsize: Tuple[int, int]) -> Tuple['Figure', Any]:
+        """
+        Get this thread's figure for a size, cleared, with a fresh set of axes.
+        
+        Figures are created outside pyplot, so they never need plt.close().
+        """
+        pool = getattr(self._fig_local, "pool", None)
+        if pool is None:
+            pool = self._fig_local.pool = {}
+        
+        fig = pool.get(figsize)
+        if fig is None:
+            fig = pool[figsize] = _matplotlib_figure()(figsize=figsize)
+            # Kept across fig.clear(), so set once per figure
+            fig.subplots_adjust(**_SUBPLOT_RECTS[figsize])
+        else:
+            fig.clear()
+        
+        return fig, fig.add_subplot(111)
+    
     def _save_matplotlib_chart(
         self,
-        fig: plt.Figure,
+        fig: 'Figure',
         chart_id: str,
         chart_type: str
     ) -> Dict[str, Any]:
         """Save matplotlib chart to file."""
         # Save as PNG
-        png_path = self.output_dir / f"{chart_id}.png"
-        fig.savefig(str(png_path), dpi=300, bbox_inches='tight')
-        plt.close(fig)
+        png_path = _output_path(self.output_dir / f"{chart_id}.png")
+        # Axes rect is fixed per figure size (_SUBPLOT_RECTS), so skip bbox_inches='tight' and its extra draw
+        fig.savefig(str(png_path), dpi=self.dpi, pil_kwargs={'compress_level': 1})
+        # Drop the chart's artists now; the figure itself is reused by _get_fig
+        fig.clear()
         
-        logger.info(f"Matplotlib chart saved: {chart_id}")
+        logger.info("Matplotlib chart saved: %s", chart_id)
         
         return {
             "chart_id": chart_id,
@@ -411,15 +985,43 @@ class ChartGenerator:
         }
 
 
-def create_chart_generator(output_dir: Optional[Path] = None) -> ChartGenerator:
+# Generators reused by _render_one within a worker process, keyed by their settings
+_worker_generators: Dict[Tuple[str, int, Optional[int], str], ChartGenerator] = {}
+
+
+def _render_one(job: Tuple[Tuple[str, int, Optional[int], str], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Render one chart in a worker process (module-level so it can be pickled)."""
+    settings_key, spec = job
+    generator = _worker_generators.get(settings_key)
+    if generator is None:
+        output_dir, dpi, downsample_threshold, plotlyjs = settings_key
+        generator = _worker_generators[settings_key] = ChartGenerator(
+            output_dir=Path(output_dir),
+            dpi=dpi,
+            downsample_threshold=downsample_threshold,
+            plotlyjs=plotlyjs,
+            render_cache_size=0  # Each worker sees only a slice of the batch
+        )
+    
+    try:
+        result = generator.create_chart(spec)
+        if result.get("png_path") in generator.flush_png_exports([result.get("png_path")]):
+            result["png_path"] = None
+        return result
+    except Exception as e:
+        logger.error(f"Error rendering chart {spec.get('chart_id')}: {e}")
+        return None
+
+
+def create_chart_generator(output_dir: Optional[Path] = None, dpi: int = 150) -> ChartGenerator:
     """
     Factory function to create a chart generator.
     
     Args:
         output_dir: Optional output directory
+        dpi: Resolution of matplotlib PNGs
         
     Returns:
         ChartGenerator instance
     """
-    return ChartGenerator(output_dir=output_dir)
-
+    return ChartGenerator(output_dir=output_dir, dpi=dpi)
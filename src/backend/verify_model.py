@@ -41,25 +41,23 @@ try:
     
     genai.configure(api_key=api_key)
     
-    # Get all available models
-    all_models = list(genai.list_models())
+    # Get all available models, indexed by name
+    by_name = {m.name: m for m in genai.list_models()}
     
     # Check each model we want to test
+    working_models = []
     for model_name in models_to_test:
         print(f"🔍 Testing: {model_name}")
         
         # Check if model exists in the list
-        full_model_name = f"models/{model_name}"
-        model_exists = any(m.name == full_model_name for m in all_models)
+        model = by_name.get(f"models/{model_name}")
         
-        if model_exists:
-            # Get the model details
-            model = next(m for m in all_models if m.name == full_model_name)
-            
+        if model is not None:
             # Check if it supports generateContent
             supports_generate = 'generateContent' in model.supported_generation_methods
             
             if supports_generate:
+                working_models.append(model_name)
                 print(f"   ✅ EXISTS and SUPPORTS generateContent")
                 print(f"   📊 Input limit: {model.input_token_limit:,} tokens")
                 print(f"   📤 Output limit: {model.output_token_limit:,} tokens")
@@ -76,16 +74,7 @@ try:
     print("=" * 80)
     print()
     
-    # Find the best working model
-    working_models = []
-    for model_name in models_to_test:
-        full_model_name = f"models/{model_name}"
-        model_exists = any(m.name == full_model_name for m in all_models)
-        if model_exists:
-            model = next(m for m in all_models if m.name == full_model_name)
-            if 'generateContent' in model.supported_generation_methods:
-                working_models.append(model_name)
-    
+    # Working models were collected while checking above
     if working_models:
         print("✅ Use one of these models:")
         for model in working_models: